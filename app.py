@@ -16,22 +16,56 @@
 
 
 
-from flask import Flask, request, jsonify
-from queue import Queue
-from services.webhook import send_webhook
+from flask import Flask, Response
+from queue import Queue, Full, Empty
+from concurrent.futures import ThreadPoolExecutor
+from secrets import token_hex
+from services.webhook import send_webhook, WebhookBatcher
 from security import register_security, require_api_key, rate_limit  # Import security module and decorators
 import threading
-import uuid
 import os
 import time
+import logging
+import atexit
 from version import BUILD_NUMBER  # Import the BUILD_NUMBER
-from app_utils import log_job_status, discover_and_register_blueprints  # Import the discover_and_register_blueprints function
+from app_utils import log_job_status, write_job_status, discover_and_register_blueprints, get_request_body, ORJSONProvider, JobStatus, pending_job_logs, install_queued_logging  # Import the discover_and_register_blueprints function
 from startup import perform_startup_tasks, get_initialization_status, is_ready  # Import startup utilities
+from config import WEBHOOK_WORKERS, WEBHOOK_BATCH_WINDOW_MS, QUEUE_WORKERS, QUEUE_DRAIN_TIMEOUT, WARM_UP_ENABLED, SKIP_MODEL_WARMUP, ENABLE_OPENAI_WHISPER, ASR_BACKEND, ASYNC_LOGGING, MAX_REQUEST_BODY_MB
+
+logger = logging.getLogger(__name__)
 
 MAX_QUEUE_LENGTH = int(os.environ.get('MAX_QUEUE_LENGTH', 0))
 
+# Cache the worker PID once; refreshed in the child if the process is forked (e.g. gunicorn preload)
+_PID = os.getpid()
+
+def _refresh_pid():
+    global _PID
+    _PID = os.getpid()
+
+os.register_at_fork(after_in_child=_refresh_pid)
+
+# Liveness only needs "the process is serving", so it is answered with a fixed
+# body before Flask routing, request context, or rate limiting. /health keeps
+# reporting readiness from Python.
+LIVENESS_PATH = '/health/live'
+_LIVENESS_BODY = b'{"service":"Sync Scribe Studio API","status":"alive"}'
+_LIVENESS_HEADERS = [('Content-Type', 'application/json'), ('Content-Length', str(len(_LIVENESS_BODY)))]
+
+def liveness_middleware(wsgi_app):
+    def middleware(environ, start_response):
+        if environ.get('PATH_INFO') == LIVENESS_PATH and environ.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+            start_response('200 OK', _LIVENESS_HEADERS)
+            return [] if environ['REQUEST_METHOD'] == 'HEAD' else [_LIVENESS_BODY]
+        return wsgi_app(environ, start_response)
+    return middleware
+
 def create_app():
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    app.wsgi_app = liveness_middleware(app.wsgi_app)
+    # Reject oversized bodies up front instead of buffering and parsing them in full
+    app.config['MAX_CONTENT_LENGTH'] = int(MAX_REQUEST_BODY_MB * 1024 * 1024)
     
     # Register security features (headers, CORS, etc.)
     register_security(app)
@@ -41,30 +75,51 @@ def create_app():
     startup_result = perform_startup_tasks()
     app.startup_result = startup_result
 
-    # Create a queue to hold tasks
-    task_queue = Queue()
+    # Create a queue to hold tasks (maxsize=0 leaves it unbounded)
+    task_queue = Queue(maxsize=MAX_QUEUE_LENGTH)
     queue_id = id(task_queue)  # Generate a single queue_id for this worker
 
+    def queue_length():
+        # Informational depth for responses: len() of the underlying deque is atomic
+        # under the GIL, so skip the mutex that qsize() takes on every call
+        return len(task_queue.queue)
+
+    # Webhooks are delivered from a separate pool so a slow receiver does not hold up the queue
+    webhook_pool = ThreadPoolExecutor(max_workers=WEBHOOK_WORKERS, thread_name_prefix='webhook')
+
+    def log_webhook_failure(future):
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"Webhook dispatch raised an unexpected error: {exc}")
+
+    def dispatch_webhook(webhook_url, body):
+        future = webhook_pool.submit(send_webhook, webhook_url, body)
+        future.add_done_callback(log_webhook_failure)
+
+    # Optionally coalesce completions for the same webhook_url into a single POST
+    webhook_batcher = WebhookBatcher(WEBHOOK_BATCH_WINDOW_MS / 1000, dispatch_webhook) if WEBHOOK_BATCH_WINDOW_MS > 0 else None
+
+    # Set on interpreter exit so consumers stop once the queue has drained
+    shutdown_event = threading.Event()
+
     # Function to process tasks from the queue
     def process_queue():
-        while True:
-            job_id, data, task_func, queue_start_time = task_queue.get()
-            queue_time = time.time() - queue_start_time
-            run_start_time = time.time()
-            pid = os.getpid()  # Get the PID of the actual processing thread
+        while not shutdown_event.is_set():
+            try:
+                job_id, data, task_func, queue_start_time = task_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            run_start_time = time.monotonic()
+            queue_time = run_start_time - queue_start_time
+            pid = _PID
             
             # Log job status as running
-            log_job_status(job_id, {
-                "job_status": "running",
-                "job_id": job_id,
-                "queue_id": queue_id,
-                "process_id": pid,
-                "response": None
-            })
+            log_job_status(job_id, JobStatus(job_id, "running", queue_id, pid))
             
             response = task_func()
-            run_time = time.time() - run_start_time
-            total_time = time.time() - queue_start_time
+            run_end_time = time.monotonic()
+            run_time = run_end_time - run_start_time
+            total_time = run_end_time - queue_start_time
 
             response_data = {
                 "endpoint": response[1],
@@ -78,50 +133,91 @@ def create_app():
                 "run_time": round(run_time, 3),
                 "queue_time": round(queue_time, 3),
                 "total_time": round(total_time, 3),
-                "queue_length": task_queue.qsize(),
+                "queue_length": queue_length(),
                 "build_number": BUILD_NUMBER  # Add build number to response
             }
             
             # Log job status as done
-            log_job_status(job_id, {
-                "job_status": "done",
-                "job_id": job_id,
-                "queue_id": queue_id,
-                "process_id": pid,
-                "response": response_data
-            })
+            log_job_status(job_id, JobStatus(job_id, "done", queue_id, pid, response_data))
 
             # Only send webhook if webhook_url has an actual value (not an empty string)
             if data.get("webhook_url") and data.get("webhook_url") != "":
-                send_webhook(data.get("webhook_url"), response_data)
+                if webhook_batcher is not None:
+                    webhook_batcher.enqueue(data.get("webhook_url"), response_data)
+                else:
+                    dispatch_webhook(data.get("webhook_url"), response_data)
 
             task_queue.task_done()
 
-    # Start the queue processing in a separate thread
-    threading.Thread(target=process_queue, daemon=True).start()
+    # Consumer threads do not survive fork, so track which process started them.
+    # With gunicorn preload the app is built in the master and each worker
+    # starts its own consumers the first time it enqueues a job.
+    workers_lock = threading.Lock()
+    workers_pid = None
+
+    def ensure_queue_workers():
+        nonlocal workers_pid
+        if workers_pid == _PID:
+            return
+        with workers_lock:
+            if workers_pid != _PID:
+                # Start QUEUE_WORKERS consumer threads draining the same queue
+                for worker_index in range(max(1, QUEUE_WORKERS)):
+                    threading.Thread(target=process_queue, name=f'queue-worker-{worker_index}', daemon=True).start()
+                workers_pid = _PID
+
+    ensure_queue_workers()
+
+    def shutdown_queue(timeout=QUEUE_DRAIN_TIMEOUT):
+        """Let in-flight and queued jobs finish (up to timeout), then stop the consumers."""
+        deadline = time.monotonic() + timeout
+        with task_queue.all_tasks_done:
+            while task_queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Shutting down with {task_queue.unfinished_tasks} unfinished queued job(s)")
+                    break
+                task_queue.all_tasks_done.wait(remaining)
+        shutdown_event.set()
+        if webhook_batcher is not None:
+            webhook_batcher.flush_all()
+        webhook_pool.shutdown(wait=True)
+
+    app.shutdown_queue = shutdown_queue
+    atexit.register(shutdown_queue)
+
+    # 202 body for queued jobs; the fixed fields are filled in once here and the
+    # per-job ones overwrite their placeholders in place, keeping the key order
+    accepted_template = {
+        "code": 202,
+        "id": None,
+        "job_id": None,
+        "message": "processing",
+        "pid": None,
+        "queue_id": queue_id,
+        "max_queue_length": MAX_QUEUE_LENGTH if MAX_QUEUE_LENGTH > 0 else "unlimited",
+        "queue_length": None,
+        "build_number": BUILD_NUMBER  # Add build number to response
+    }
 
     # Decorator to add tasks to the queue or bypass it
-    def queue_task(bypass_queue=False):
+    def queue_task(bypass_queue=False, always_queue=False):
         def decorator(f):
             def wrapper(*args, **kwargs):
-                job_id = str(uuid.uuid4())
-                data = request.json if request.is_json else {}
-                pid = os.getpid()  # Get PID for non-queued tasks
-                start_time = time.time()
+                job_id = token_hex(16)  # 32 hex chars straight from os.urandom, no UUID object
+                data = get_request_body()
+                pid = _PID
+                start_time = time.monotonic()  # Only used for durations, so monotonic is enough
                 
-                if bypass_queue or 'webhook_url' not in data:
+                # Without a webhook_url the job runs inline unless the route asks to always queue;
+                # queued jobs without a webhook are picked up via /v1/toolkit/job/status
+                if bypass_queue or not (always_queue or 'webhook_url' in data):
                     
                     # Log job status as running immediately (bypassing queue)
-                    log_job_status(job_id, {
-                        "job_status": "running",
-                        "job_id": job_id,
-                        "queue_id": queue_id,
-                        "process_id": pid,
-                        "response": None
-                    })
+                    log_job_status(job_id, JobStatus(job_id, "running", queue_id, pid))
                     
                     response = f(job_id=job_id, data=data, *args, **kwargs)
-                    run_time = time.time() - start_time
+                    run_time = time.monotonic() - start_time
                     
                     response_obj = {
                         "code": response[2],
@@ -134,22 +230,24 @@ def create_app():
                         "total_time": round(run_time, 3),
                         "pid": pid,
                         "queue_id": queue_id,
-                        "queue_length": task_queue.qsize(),
+                        "queue_length": queue_length(),
                         "build_number": BUILD_NUMBER  # Add build number to response
                     }
                     
                     # Log job status as done
-                    log_job_status(job_id, {
-                        "job_status": "done",
-                        "job_id": job_id,
-                        "queue_id": queue_id,
-                        "process_id": pid,
-                        "response": response_obj
-                    })
+                    log_job_status(job_id, JobStatus(job_id, "done", queue_id, pid, response_obj))
                     
                     return response_obj, response[2]
                 else:
-                    if MAX_QUEUE_LENGTH > 0 and task_queue.qsize() >= MAX_QUEUE_LENGTH:
+                    # Write the queued status before responding so polling the job right after the 202 finds it
+                    write_job_status(job_id, JobStatus(job_id, "queued", queue_id, pid))
+                    
+                    ensure_queue_workers()
+                    
+                    # The queue is bounded by MAX_QUEUE_LENGTH, so a full queue rejects instead of growing
+                    try:
+                        task_queue.put_nowait((job_id, data, lambda: f(job_id=job_id, data=data, *args, **kwargs), start_time))
+                    except Full:
                         error_response = {
                             "code": 429,
                             "id": data.get("id"),
@@ -157,43 +255,18 @@ def create_app():
                             "message": f"MAX_QUEUE_LENGTH ({MAX_QUEUE_LENGTH}) reached",
                             "pid": pid,
                             "queue_id": queue_id,
-                            "queue_length": task_queue.qsize(),
+                            "queue_length": queue_length(),
                             "build_number": BUILD_NUMBER  # Add build number to response
                         }
                         
                         # Log the queue overflow error
-                        log_job_status(job_id, {
-                            "job_status": "done",
-                            "job_id": job_id,
-                            "queue_id": queue_id,
-                            "process_id": pid,
-                            "response": error_response
-                        })
+                        log_job_status(job_id, JobStatus(job_id, "done", queue_id, pid, error_response))
                         
                         return error_response, 429
                     
-                    # Log job status as queued
-                    log_job_status(job_id, {
-                        "job_status": "queued",
-                        "job_id": job_id,
-                        "queue_id": queue_id,
-                        "process_id": pid,
-                        "response": None
-                    })
-                    
-                    task_queue.put((job_id, data, lambda: f(job_id=job_id, data=data, *args, **kwargs), start_time))
-                    
-                    return {
-                        "code": 202,
-                        "id": data.get("id"),
-                        "job_id": job_id,
-                        "message": "processing",
-                        "pid": pid,
-                        "queue_id": queue_id,
-                        "max_queue_length": MAX_QUEUE_LENGTH if MAX_QUEUE_LENGTH > 0 else "unlimited",
-                        "queue_length": task_queue.qsize(),
-                        "build_number": BUILD_NUMBER  # Add build number to response
-                    }, 202
+                    accepted = dict(accepted_template)
+                    accepted.update(id=data.get("id"), job_id=job_id, pid=pid, queue_length=queue_length())
+                    return accepted, 202
             return wrapper
         return decorator
 
@@ -205,11 +278,20 @@ def create_app():
     
     # Use the discover_and_register_blueprints function to register all blueprints
     discover_and_register_blueprints(app)
+    
+    # Blueprint imports configure the root handlers, so queue them once everything is loaded
+    if ASYNC_LOGGING:
+        install_queued_logging()
 
     return app
 
 app = create_app()
 
+# Serialized /health body, reused for HEALTH_CACHE_TTL seconds while readiness is unchanged
+HEALTH_CACHE_TTL = 1.0
+_health_cache = {'key': None, 'cached_at': 0.0, 'body': None, 'code': 200}
+_READY_LATCHED = 'ready'
+
 # Health check endpoint with optional security decorators
 @app.route('/health', methods=['GET'])
 @rate_limit()  # Apply rate limiting (100 requests per minute by default)
@@ -221,11 +303,30 @@ def health_check():
     - 200: Service is healthy and ready
     - 503: Service is starting up (model loading)
     """
+    # Check if application is ready
+    ready = is_ready()
+    now = time.monotonic()
+    
+    # Once startup has latched ready the status can no longer change, so skip re-reading it
+    if ready and _health_cache['key'] == _READY_LATCHED and now - _health_cache['cached_at'] < HEALTH_CACHE_TTL:
+        return Response(_health_cache['body'], status=200, mimetype='application/json')
+    
     # Get initialization status
     init_status = get_initialization_status()
     
-    # Check if application is ready
-    ready = is_ready()
+    # Probes hit this every few seconds; reuse the serialized body while the state is unchanged
+    if init_status.get('ready'):
+        cache_key = _READY_LATCHED
+    else:
+        cache_key = (
+            ready,
+            init_status.get('model_loaded', False),
+            init_status.get('model_load_time'),
+            init_status.get('initialized_at'),
+            init_status.get('model_error'),
+        )
+    if _health_cache['key'] == cache_key and now - _health_cache['cached_at'] < HEALTH_CACHE_TTL:
+        return Response(_health_cache['body'], status=_health_cache['code'], mimetype='application/json')
     
     # Build response
     response = {
@@ -244,20 +345,23 @@ def health_check():
     if init_status.get('model_error'):
         response["initialization"]["error"] = init_status['model_error']
     
+    # Records still waiting for the job log writer; a growing number means the log disk is falling behind
+    response["job_log_backlog"] = pending_job_logs()
+    
     # Add configuration info
     response["configuration"] = {
-        "warm_up_enabled": os.environ.get('ENABLE_MODEL_WARM_UP', 'true').lower() == 'true',
-        "skip_warmup": os.environ.get('SKIP_MODEL_WARMUP', 'false').lower() == 'true',
-        "openai_whisper_enabled": os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true',
-        "asr_backend": "openai-whisper" if os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true' else "faster-whisper",
+        "warm_up_enabled": WARM_UP_ENABLED,
+        "skip_warmup": SKIP_MODEL_WARMUP,
+        "openai_whisper_enabled": ENABLE_OPENAI_WHISPER,
+        "asr_backend": ASR_BACKEND,
     }
     
     # Return 503 if not ready (for container health checks)
     # This will prevent traffic from being routed until model is loaded
-    if not ready:
-        return jsonify(response), 503
+    code = 200 if ready else 503
     
-    return jsonify(response), 200
+    _health_cache.update(key=cache_key, cached_at=now, body=app.json.dumps(response), code=code)
+    return Response(_health_cache['body'], status=code, mimetype='application/json')
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
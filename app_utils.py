@@ -16,54 +16,258 @@
 
 
 
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
+from flask.json.provider import DefaultJSONProvider
 from functools import wraps
 import jsonschema
+import orjson
 import os
-import json
 import time
+import queue
+import atexit
+import tempfile
+import logging
+import logging.handlers
+import threading
 from config import LOCAL_STORAGE_PATH
 
+logger = logging.getLogger(__name__)
+
+# Encoding options shared by API responses and webhook bodies, so both accept the same payloads
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster encoding and decoding."""
+
+    def dumps(self, obj, **kwargs):
+        option = ORJSON_OPTIONS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        # Fall back to Flask's handling of dates, decimals, dataclasses, etc.
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def get_request_body():
+    """Parse the JSON body once per request and reuse it from flask.g."""
+    if 'body' not in g:
+        g.body = request.get_json(cache=True, silent=True) or {}
+    return g.body
+
+def compile_schema(schema):
+    """Check a JSON schema and return a reusable validator for it."""
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
 def validate_payload(schema):
+    # Check the schema and build its validator once, when the route is decorated,
+    # instead of on every request as jsonschema.validate() would. A validator
+    # already built with compile_schema() is used as is.
+    validator = schema if hasattr(schema, 'iter_errors') else compile_schema(schema)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not request.json:
+            body = get_request_body()
+            if not body:
                 return jsonify({"message": "Missing JSON in request"}), 400
-            try:
-                jsonschema.validate(instance=request.json, schema=schema)
-            except jsonschema.exceptions.ValidationError as validation_error:
+            validation_error = jsonschema.exceptions.best_match(validator.iter_errors(body))
+            if validation_error is not None:
                 return jsonify({"message": f"Invalid payload: {validation_error.message}"}), 400
             
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+# Job status records are written by a background thread in small batches
+_LOG_BATCH_MAX = 64
+_LOG_BATCH_WINDOW = 0.05  # seconds to wait for more records before writing a batch
+_LOG_FLUSH_TIMEOUT = 5.0  # seconds to wait for the writer to finish at exit
+_LOG_STOP = object()  # queued last to tell the writer thread to exit
+_log_queue = queue.Queue()
+_log_writer_lock = threading.Lock()
+_log_writer_pid = None
+_log_writer_thread = None
+
+class JobStatus:
+    """Job status record; slots avoid a per-job dict until it is written to disk."""
+    __slots__ = ('job_id', 'job_status', 'queue_id', 'process_id', 'response')
+
+    def __init__(self, job_id, job_status, queue_id, process_id, response=None):
+        self.job_id = job_id
+        self.job_status = job_status
+        self.queue_id = queue_id
+        self.process_id = process_id
+        self.response = response
+
+    def to_dict(self):
+        return {
+            "job_status": self.job_status,
+            "job_id": self.job_id,
+            "queue_id": self.queue_id,
+            "process_id": self.process_id,
+            "response": self.response
+        }
+
+def _write_job_file(job_id, data):
+    jobs_dir = os.path.join(LOCAL_STORAGE_PATH, 'jobs')
+    
+    # Create jobs directory if it doesn't exist
+    if not os.path.exists(jobs_dir):
+        os.makedirs(jobs_dir, exist_ok=True)
+    
+    # Create or update the job log file
+    job_file = os.path.join(jobs_dir, f"{job_id}.json")
+    
+    if isinstance(data, JobStatus):
+        data = data.to_dict()
+    
+    # Write to a temporary file and swap it in, so readers never see a half-written record
+    fd, tmp_path = tempfile.mkstemp(dir=jobs_dir, prefix=f".{job_id}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(data, option=ORJSON_OPTIONS | orjson.OPT_INDENT_2))
+        os.replace(tmp_path, job_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _write_job_batch(records):
+    # Only the latest status per job needs to hit disk, so queued/running/done
+    # updates that land in the same batch collapse into a single write
+    latest = {}
+    for job_id, data in records:
+        latest[job_id] = data
+    for job_id, data in latest.items():
+        try:
+            _write_job_file(job_id, data)
+        except Exception as e:
+            logger.error(f"Failed to write job status for {job_id}: {e}")
+
+def _drain_log_queue(block=True):
+    records = []
+    try:
+        records.append(_log_queue.get(block=block))
+    except queue.Empty:
+        return records
+    deadline = time.monotonic() + _LOG_BATCH_WINDOW
+    while len(records) < _LOG_BATCH_MAX:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not block:
+            break
+        try:
+            records.append(_log_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return records
+
+def _log_writer():
+    while True:
+        records = _drain_log_queue()
+        stop = any(record is _LOG_STOP for record in records)
+        _write_job_batch([record for record in records if record is not _LOG_STOP])
+        if stop:
+            return
+
+def _ensure_log_writer():
+    global _log_writer_pid, _log_writer_thread
+    # Threads do not survive fork, so start a writer per process on first use
+    if _log_writer_pid == os.getpid():
+        return
+    with _log_writer_lock:
+        if _log_writer_pid != os.getpid():
+            _log_writer_thread = threading.Thread(target=_log_writer, name='job-log-writer', daemon=True)
+            _log_writer_thread.start()
+            _log_writer_pid = os.getpid()
+
+def pending_job_logs():
+    """Number of job status records waiting for the background writer."""
+    return _log_queue.qsize()
+
+@atexit.register
+def flush_job_logs():
+    """Stop the background writer, then write any job status records it left behind."""
+    global _log_writer_pid
+    with _log_writer_lock:
+        writer = _log_writer_thread if _log_writer_pid == os.getpid() else None
+        _log_writer_pid = None
+    if writer is not None and writer.is_alive():
+        _log_queue.put_nowait(_LOG_STOP)
+        writer.join(_LOG_FLUSH_TIMEOUT)
+    while True:
+        records = _drain_log_queue(block=False)
+        if not records:
+            break
+        _write_job_batch([record for record in records if record is not _LOG_STOP])
+
 def log_job_status(job_id, data):
     """
     Log job status to a file in the STORAGE_PATH/jobs folder
     
+    The record is handed to a background writer which batches file writes
+    so the request path and queue workers never block on disk I/O.
+    
     Args:
         job_id (str): The unique job ID
-        data (dict): Data to write to the log file
+        data (JobStatus or dict): Data to write to the log file
     """
-    jobs_dir = os.path.join(LOCAL_STORAGE_PATH, 'jobs')
+    _ensure_log_writer()
+    _log_queue.put_nowait((job_id, data))
+
+def write_job_status(job_id, data):
+    """
+    Write a job status file immediately, bypassing the background writer
     
-    # Create jobs directory if it doesn't exist
-    if not os.path.exists(jobs_dir):
-        os.makedirs(jobs_dir, exist_ok=True)
+    Use this when the record must exist before the caller responds, e.g. the
+    "queued" record behind a 202, so clients polling the job never miss it.
     
-    # Create or update the job log file
-    job_file = os.path.join(jobs_dir, f"{job_id}.json")
+    Args:
+        job_id (str): The unique job ID
+        data (JobStatus or dict): Data to write to the log file
+    """
+    _write_job_file(job_id, data)
+
+def install_queued_logging():
+    """
+    Move the root logger's handlers behind a QueueHandler.
+    
+    Callers only format and enqueue a record; a QueueListener thread does the
+    actual stream/file writes. The listener thread does not survive fork and
+    no fork hook restarts it (the queue's lock may be held mid-fork), so call
+    this in the process that logs, i.e. not in a preloading Gunicorn master.
+    """
+    root = logging.getLogger()
+    handlers = [h for h in root.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    if not handlers:
+        return
+    log_records = queue.Queue()
+    queue_handler = logging.handlers.QueueHandler(log_records)
+    listener = [logging.handlers.QueueListener(log_records, *handlers, respect_handler_level=True)]
+    
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    listener[0].start()
     
-    # Write data directly to file
-    with open(job_file, 'w') as f:
-        json.dump(data, f, indent=2)
+    @atexit.register
+    def _stop_log_listener():
+        # Write what is still queued, then log synchronously for the rest of
+        # shutdown (e.g. the job queue drain, which is registered earlier)
+        if listener[0] is not None:
+            listener[0].stop()
+            listener[0] = None
+        root.removeHandler(queue_handler)
+        for handler in handlers:
+            root.addHandler(handler)
 
-def queue_task_wrapper(bypass_queue=False):
+def queue_task_wrapper(bypass_queue=False, always_queue=False):
     def decorator(f):
         def wrapper(*args, **kwargs):
-            return current_app.queue_task(bypass_queue=bypass_queue)(f)(*args, **kwargs)
+            return current_app.queue_task(bypass_queue=bypass_queue, always_queue=always_queue)(f)(*args, **kwargs)
         return wrapper
     return decorator
 
@@ -78,7 +282,6 @@ def discover_and_register_blueprints(app, base_dir='routes'):
     """
     import importlib
     import pkgutil
-    import inspect
     import sys
     import os
     from flask import Blueprint
@@ -98,6 +301,7 @@ def discover_and_register_blueprints(app, base_dir='routes'):
         base_dir = os.path.join(cwd, base_dir)
     
     registered_blueprints = set()
+    pid = os.getpid()
     
     # Find all Python files in the routes directory, including subdirectories
     python_files = glob.glob(os.path.join(base_dir, '**', '*.py'), recursive=True)
@@ -121,10 +325,14 @@ def discover_and_register_blueprints(app, base_dir='routes'):
             # Import the module
             module = importlib.import_module(module_path)
             
-            # Find all Blueprint instances in the module
-            for name, obj in inspect.getmembers(module):
-                if isinstance(obj, Blueprint) and obj not in registered_blueprints:
-                    pid = os.getpid()
+            # Find all Blueprint instances in the module. Only the blueprints are
+            # sorted (by name, as inspect.getmembers did), rather than every
+            # attribute the module imports
+            blueprints = sorted(
+                (name, obj) for name, obj in vars(module).items() if isinstance(obj, Blueprint)
+            )
+            for name, obj in blueprints:
+                if obj not in registered_blueprints:
                     logger.info(f"PID {pid} Registering: {module_path}")
                     app.register_blueprint(obj)
                     registered_blueprints.add(obj)
@@ -18,6 +18,8 @@
 
 import os
 import logging
+from types import MappingProxyType
+from typing import Final
 
 # Retrieve the API key from environment variables
 API_KEY = os.environ.get('API_KEY')
@@ -27,6 +29,50 @@ if not API_KEY:
 # Storage path setting
 LOCAL_STORAGE_PATH = os.environ.get('LOCAL_STORAGE_PATH', '/tmp')
 
+# Webhook delivery settings
+# Timeout (seconds) for webhook POSTs so a slow receiver cannot stall the queue worker
+WEBHOOK_TIMEOUT = float(os.environ.get('WEBHOOK_TIMEOUT', '30'))
+# Number of background threads delivering webhooks off the queue worker
+WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', '8'))
+# Window (ms) for coalescing completions sent to the same webhook_url into one POST; 0 disables batching
+WEBHOOK_BATCH_WINDOW_MS = int(os.environ.get('WEBHOOK_BATCH_WINDOW_MS', '0'))
+# Consecutive failed deliveries to one webhook URL before its webhooks are skipped (0 = never),
+# and for how long (seconds)
+WEBHOOK_BREAKER_THRESHOLD = int(os.environ.get('WEBHOOK_BREAKER_THRESHOLD', '0'))
+WEBHOOK_BREAKER_COOLDOWN = float(os.environ.get('WEBHOOK_BREAKER_COOLDOWN', '30'))
+
+# Outbound HTTP connection pools (media downloads and webhooks)
+# Number of hosts to keep pools for, and keep-alive connections kept per host
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '32'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '64'))
+# Media downloads allowed to stream at once per worker, and seconds a download waits for a free slot
+MAX_CONCURRENT_DOWNLOADS = int(os.environ.get('MAX_CONCURRENT_DOWNLOADS', '16'))
+DOWNLOAD_SLOT_TIMEOUT = float(os.environ.get('DOWNLOAD_SLOT_TIMEOUT', '60'))
+# Seconds to connect to a media origin, and the longest a download may stall between reads
+DOWNLOAD_CONNECT_TIMEOUT = float(os.environ.get('DOWNLOAD_CONNECT_TIMEOUT', '10'))
+DOWNLOAD_READ_TIMEOUT = float(os.environ.get('DOWNLOAD_READ_TIMEOUT', '60'))
+
+# Hand log records to a background thread so request and queue threads never block on stream writes
+ASYNC_LOGGING = os.environ.get('ASYNC_LOGGING', 'false').lower() == 'true'
+
+# Largest request body accepted, in MB; larger ones get 413 from the Content-Length
+# before the body is read or parsed (media is passed by URL, so JSON bodies are small)
+MAX_REQUEST_BODY_MB = float(os.environ.get('MAX_REQUEST_BODY_MB', '16'))
+
+# Queue settings
+# Number of consumer threads draining the job queue concurrently (1 = one job at a time)
+QUEUE_WORKERS = int(os.environ.get('QUEUE_WORKERS', '1'))
+# Seconds to wait for queued jobs to finish when a worker shuts down
+QUEUE_DRAIN_TIMEOUT = float(os.environ.get('QUEUE_DRAIN_TIMEOUT', '25'))
+
+# Per-API-key request limit for the CPU-heavy m4a conversion endpoint
+M4A_RATE_LIMIT_PER_MINUTE = int(os.environ.get('M4A_RATE_LIMIT_PER_MINUTE', '30'))
+# Inline (no webhook_url) conversions a single API key may have running at once on that endpoint;
+# queued conversions are bounded by QUEUE_WORKERS instead
+M4A_MAX_CONCURRENT = int(os.environ.get('M4A_MAX_CONCURRENT', '2'))
+# Queue m4a conversions even without webhook_url, answering 202 with a job_id to poll
+M4A_ALWAYS_QUEUE = os.environ.get('M4A_ALWAYS_QUEUE', 'false').lower() == 'true'
+
 # GCP environment variables
 GCP_SA_CREDENTIALS = os.environ.get('GCP_SA_CREDENTIALS', '')
 GCP_BUCKET_NAME = os.environ.get('GCP_BUCKET_NAME', '')
@@ -35,16 +81,21 @@ GCP_BUCKET_NAME = os.environ.get('GCP_BUCKET_NAME', '')
 # ASR (Automatic Speech Recognition) Configuration
 # Faster-Whisper is now the default ASR backend for better performance
 # To use legacy OpenAI Whisper, explicitly set ENABLE_OPENAI_WHISPER=true
-ENABLE_OPENAI_WHISPER = os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true'
+ENABLE_OPENAI_WHISPER: Final[bool] = os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true'
+ASR_BACKEND: Final[str] = 'openai-whisper' if ENABLE_OPENAI_WHISPER else 'faster-whisper'
+
+# Model warm-up flags, read once so per-request code (e.g. /health) does not re-parse the environment
+WARM_UP_ENABLED: Final[bool] = os.environ.get('ENABLE_MODEL_WARM_UP', 'true').lower() == 'true'
+SKIP_MODEL_WARMUP: Final[bool] = os.environ.get('SKIP_MODEL_WARMUP', 'false').lower() == 'true'
 
 # Performance Profile System
 # Options: 'speed', 'accuracy', 'balanced', 'accuracy-turbo', 'custom'
 # Speed profile is now the default for optimal performance (better speed AND accuracy than balanced)
-ASR_PROFILE = os.environ.get('ASR_PROFILE', 'speed').lower()
+ASR_PROFILE: Final[str] = os.environ.get('ASR_PROFILE', 'speed').lower()
 
 # Profile-based configurations
 # Note: temperature_increment_on_fallback is not supported by faster-whisper
-PROFILE_CONFIGS = {
+_PROFILE_DEFAULTS = {
     'speed': {
         'model_id': 'openai/whisper-small',
         'beam_size': 1,
@@ -87,27 +138,34 @@ PROFILE_CONFIGS = {
     }
 }
 
+# Read-only view so callers cannot mutate profile defaults at runtime
+PROFILE_CONFIGS: Final = MappingProxyType({
+    name: MappingProxyType(profile) for name, profile in _PROFILE_DEFAULTS.items()
+})
+
 # Get profile configuration
 _profile_config = PROFILE_CONFIGS.get(ASR_PROFILE, PROFILE_CONFIGS['speed'])
 
 # Faster-Whisper ASR Settings with profile-based defaults
-ASR_MODEL_ID = os.environ.get('ASR_MODEL_ID', _profile_config['model_id'])
-ASR_DEVICE = os.environ.get('ASR_DEVICE', 'auto')  # Options: 'cpu', 'cuda', 'auto'
-ASR_COMPUTE_TYPE = os.environ.get('ASR_COMPUTE_TYPE', 'auto')  # Options: 'int8', 'int8_float32', 'float16', 'float32', 'auto'
-ASR_BEAM_SIZE = int(os.environ.get('ASR_BEAM_SIZE', str(_profile_config['beam_size'])))
-ASR_BEST_OF = int(os.environ.get('ASR_BEST_OF', str(_profile_config['best_of'])))
-ASR_TEMPERATURE = float(os.environ.get('ASR_TEMPERATURE', str(_profile_config['temperature'])))
+ASR_MODEL_ID: Final[str] = os.environ.get('ASR_MODEL_ID', _profile_config['model_id'])
+ASR_DEVICE: Final[str] = os.environ.get('ASR_DEVICE', 'auto')  # Options: 'cpu', 'cuda', 'auto'
+ASR_COMPUTE_TYPE: Final[str] = os.environ.get('ASR_COMPUTE_TYPE', 'auto')  # Options: 'int8', 'int8_float32', 'float16', 'float32', 'auto'
+ASR_BEAM_SIZE: Final[int] = int(os.environ.get('ASR_BEAM_SIZE', str(_profile_config['beam_size'])))
+ASR_BEST_OF: Final[int] = int(os.environ.get('ASR_BEST_OF', str(_profile_config['best_of'])))
+ASR_TEMPERATURE: Final[float] = float(os.environ.get('ASR_TEMPERATURE', str(_profile_config['temperature'])))
 # Note: ASR_TEMPERATURE_INCREMENT not used with faster-whisper
 
 # Performance-optimized batch sizes and threading based on profile
 _device_type = ASR_DEVICE if ASR_DEVICE != 'auto' else 'gpu'  # Assume GPU for auto
 _default_batch_size = str(_profile_config[f'batch_size_cpu' if _device_type == 'cpu' else 'batch_size_gpu'])
-ASR_BATCH_SIZE = int(os.environ.get('ASR_BATCH_SIZE', _default_batch_size))
-ASR_NUM_WORKERS = int(os.environ.get('ASR_NUM_WORKERS', '1'))  # Reduced to 1 for better GPU utilization
+ASR_BATCH_SIZE: Final[int] = int(os.environ.get('ASR_BATCH_SIZE', _default_batch_size))
+ASR_NUM_WORKERS: Final[int] = int(os.environ.get('ASR_NUM_WORKERS', '1'))  # Reduced to 1 for better GPU utilization
 
 # VAD settings from profile
-ASR_VAD_MIN_SILENCE_MS = int(os.environ.get('ASR_VAD_MIN_SILENCE_MS', str(_profile_config['vad_min_silence_ms'])))
-ASR_CACHE_DIR = os.environ.get('ASR_CACHE_DIR', os.path.join(LOCAL_STORAGE_PATH, 'asr_cache'))
+ASR_VAD_MIN_SILENCE_MS: Final[int] = int(os.environ.get('ASR_VAD_MIN_SILENCE_MS', str(_profile_config['vad_min_silence_ms'])))
+ASR_CACHE_DIR: Final[str] = os.environ.get('ASR_CACHE_DIR', os.path.join(LOCAL_STORAGE_PATH, 'asr_cache'))
+# Optional tmpfs directory (e.g. /dev/shm/asr_cache) the model files are copied to and loaded from
+ASR_SHM_CACHE_DIR: Final[str] = os.environ.get('ASR_SHM_CACHE_DIR', '')
 
 # Image Generation Configuration
 # FLUX.1-dev with Optimum-Quanto FP8 + LoRA-by-URL
@@ -117,6 +175,12 @@ MAX_STEPS = 50  # Maximum inference steps
 IMAGE_CONCURRENCY = 1  # Serialize image generation on single H100
 WEIGHTS_DIR = "/runpod-volume/models/flux-dev"  # Network Volume model path
 
+# Variables each storage provider needs, built once rather than on every upload
+_REQUIRED_STORAGE_VARS = {
+    'S3': ('S3_ENDPOINT_URL', 'S3_ACCESS_KEY', 'S3_SECRET_KEY', 'S3_BUCKET_NAME', 'S3_REGION'),
+    'S3_DO': ('S3_ENDPOINT_URL', 'S3_ACCESS_KEY', 'S3_SECRET_KEY'),
+}
+
 def validate_env_vars(provider):
 
     """ Validate the necessary environment variables for the selected storage provider """
@@ -128,12 +192,9 @@ def validate_env_vars(provider):
             raise ValueError(f"Missing environment variables for GCP storage: GCP_SA_CREDENTIALS or GCP_SA_KEY_BASE64")
         return  # Valid GCP config
     
-    required_vars = {
-        'S3': ['S3_ENDPOINT_URL', 'S3_ACCESS_KEY', 'S3_SECRET_KEY', 'S3_BUCKET_NAME', 'S3_REGION'],
-        'S3_DO': ['S3_ENDPOINT_URL', 'S3_ACCESS_KEY', 'S3_SECRET_KEY']
-    }
-    
-    if provider in required_vars:
-        missing_vars = [var for var in required_vars[provider] if not os.getenv(var)]
+    required_vars = _REQUIRED_STORAGE_VARS.get(provider)
+    if required_vars:
+        environ = os.environ
+        missing_vars = [var for var in required_vars if not environ.get(var)]
         if missing_vars:
             raise ValueError(f"Missing environment variables for {provider} storage: {', '.join(missing_vars)}")
@@ -0,0 +1,63 @@
+# Copyright (c) 2025
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+
+
+"""
+Gunicorn configuration.
+
+By default each worker builds its own app after fork. With GUNICORN_PRELOAD
+the app is instead built once in the master and shared with the workers
+copy-on-write; freezing the GC before fork keeps the collector from touching
+those inherited pages, which would otherwise force each worker to copy them.
+Preloading is opt-in because create_app() then runs in the master: the warm
+ASR model (possibly a CUDA context) and any threads started there do not
+survive the fork.
+"""
+
+import gc
+import os
+
+# Load the app in the master before forking workers (opt-in, see above)
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+# Set GUNICORN_WORKER_CLASS=gthread to opt into threaded workers, so I/O-bound
+# requests (downloads, uploads, webhooks) do not monopolise a whole process;
+# each worker then serves GUNICORN_THREADS requests at once
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+# Only set for gthread: Gunicorn turns a sync worker into gthread whenever threads > 1
+if worker_class == 'gthread':
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+
+def when_ready(server):
+    # Everything allocated so far belongs to the master; move it out of GC tracking.
+    # Without preloading the master holds no app, so there is nothing worth freezing
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+    # Sockets opened in the master would be shared by every worker, so each
+    # worker opens its own storage connection in the background after fork
+    try:
+        from services.cloud_storage import preconnect_storage
+        preconnect_storage()
+    except Exception as e:
+        server.log.debug(f"Storage preconnect skipped: {e}")
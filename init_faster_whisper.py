@@ -6,8 +6,8 @@ This script attempts to work around the ctranslate2 library loading issue.
 
 import os
 import sys
-import subprocess
 import logging
+import importlib.util
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +16,11 @@ def init_faster_whisper():
     """
     Initialize faster-whisper with workarounds for ctranslate2 issues.
     """
+    # Check installation without importing; a missing package needs no workaround
+    if importlib.util.find_spec('faster_whisper') is None:
+        logger.warning("faster_whisper is not installed")
+        return False
+    
     # Set environment variables that might help
     os.environ['LD_BIND_NOW'] = '1'
     os.environ['OMP_NUM_THREADS'] = '1'  # Limit OpenMP threads
@@ -37,17 +42,15 @@ def init_faster_whisper():
             # Set environment variable to use OpenAI Whisper instead
             os.environ['ENABLE_OPENAI_WHISPER'] = 'true'
             
-            # Try to import OpenAI Whisper
-            try:
-                import whisper
-                logger.info("✓ Successfully imported OpenAI Whisper as fallback")
-                return True
-            except ImportError:
-                logger.error("OpenAI Whisper is not installed either")
-                logger.info("Installing OpenAI Whisper...")
-                subprocess.run([sys.executable, "-m", "pip", "install", "openai-whisper"], check=True)
-                logger.info("✓ Installed OpenAI Whisper")
+            # Check for OpenAI Whisper without importing it (and torch) here;
+            # the ASR service imports it in the worker on first use
+            if importlib.util.find_spec('whisper') is not None:
+                logger.info("✓ OpenAI Whisper is available as fallback")
                 return True
+            
+            # Installed at image build time from requirements.txt; never pip install at startup
+            logger.error("OpenAI Whisper is not installed either; add openai-whisper to the image build")
+            return False
         
         return False
 
@@ -65,8 +65,8 @@ def caption_video(job_id, data):
     webhook_url = data.get('webhook_url')
     id = data.get('id')
 
-    logger.info(f"Job {job_id}: Received captioning request for {video_url}")
-    logger.info(f"Job {job_id}: Options received: {options}")
+    # One lazily formatted record per request; the options dict is only rendered when INFO is enabled
+    logger.info("Job %s: Received captioning request for %s with options: %s", job_id, video_url, options)
 
     if caption_ass is not None:
         captions = caption_ass
@@ -25,11 +25,12 @@ import uuid
 import json
 from google.oauth2.service_account import Credentials
 from google.auth.transport.requests import Request
-from datetime import datetime
 import time
+import random
 import psutil
 from services.authentication import authenticate
 from app_utils import validate_payload, queue_task_wrapper
+from config import GCP_SA_CREDENTIALS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -39,8 +40,14 @@ logger = logging.getLogger(__name__)
 gdrive_upload_bp = Blueprint('gdrive_upload', __name__)
 
 # Environment variables
-GCP_SA_CREDENTIALS = os.getenv('GCP_SA_CREDENTIALS')
 GDRIVE_USER = os.getenv('GDRIVE_USER')
+# Chunk retries back off exponentially from the base delay, capped at the max, with full jitter
+GDRIVE_RETRY_BASE_DELAY = float(os.getenv('GDRIVE_RETRY_BASE_DELAY', '1'))
+GDRIVE_RETRY_MAX_DELAY = float(os.getenv('GDRIVE_RETRY_MAX_DELAY', '30'))
+
+def retry_delay(attempt):
+    """Full-jitter exponential backoff so concurrent uploads do not retry in lockstep."""
+    return random.uniform(0, min(GDRIVE_RETRY_MAX_DELAY, GDRIVE_RETRY_BASE_DELAY * 2 ** attempt))
 
 # Class to track upload progress
 class UploadProgress:
@@ -97,7 +104,6 @@ def upload_file_in_chunks(file_url, upload_url, total_size, job_id, chunk_size):
     """
     bytes_uploaded = 0
     max_retries = 5
-    retry_delay = 5  # seconds
 
     progress = UploadProgress(job_id, total_size)
 
@@ -144,8 +150,9 @@ def upload_file_in_chunks(file_url, upload_url, total_size, job_id, chunk_size):
                         except requests.exceptions.RequestException as e:
                             logger.error(f"Job {job_id}: Network error during upload: {e}")
                             if attempt < max_retries - 1:
-                                logger.info(f"Job {job_id}: Retrying upload chunk after {retry_delay} seconds...")
-                                time.sleep(retry_delay)
+                                delay = retry_delay(attempt)
+                                logger.info(f"Job {job_id}: Retrying upload chunk after {delay:.2f} seconds...")
+                                time.sleep(delay)
                                 continue
                             else:
                                 logger.error(f"Job {job_id}: Max retries reached. Upload failed.")
@@ -228,31 +235,38 @@ def log_system_resources():
     Logs system resource usage and upload progress at regular intervals.
     """
     while True:
-        # Get memory and disk usage
-        memory_info = psutil.virtual_memory()
-        disk_info = psutil.disk_usage('/')
-
         with uploads_lock:
-            for progress in active_uploads:
-                with progress.lock:
-                    # Calculate the percentage uploaded
-                    percentage = (progress.bytes_uploaded / progress.total_size) * 100 if progress.total_size > 0 else 0
-                    elapsed_time = time.time() - progress.start_time
+            uploads = list(active_uploads)
 
-                    # Log upload progress every 1%
-                    if int(percentage) >= progress.last_logged_percentage + 1:
-                        progress.last_logged_percentage = int(percentage)
-                        logger.info(
-                            f"Job {progress.job_id}: Uploaded {progress.bytes_uploaded} of {progress.total_size} bytes "
-                            f"({percentage:.2f}%), Elapsed Time: {int(elapsed_time)} seconds"
-                        )
+        # Memory/disk are only sampled (and the timestamp formatted) when an
+        # upload actually crosses a 5% mark, not on every idle tick
+        resources = None
+        for progress in uploads:
+            with progress.lock:
+                # Calculate the percentage uploaded
+                percentage = (progress.bytes_uploaded / progress.total_size) * 100 if progress.total_size > 0 else 0
+                elapsed_time = time.time() - progress.start_time
 
-                    # Log system resource usage every 5%
-                    if int(percentage) >= progress.last_logged_resource_percentage + 5:
-                        progress.last_logged_resource_percentage = int(percentage)
-                        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        logger.info(f"[{current_time}] Memory Usage: {memory_info.percent}% used")
-                        logger.info(f"[{current_time}] Disk Usage: {disk_info.percent}% used")
+                # Log upload progress every 1%
+                if int(percentage) >= progress.last_logged_percentage + 1:
+                    progress.last_logged_percentage = int(percentage)
+                    logger.info(
+                        f"Job {progress.job_id}: Uploaded {progress.bytes_uploaded} of {progress.total_size} bytes "
+                        f"({percentage:.2f}%), Elapsed Time: {int(elapsed_time)} seconds"
+                    )
+
+                # Log system resource usage every 5%
+                if int(percentage) >= progress.last_logged_resource_percentage + 5:
+                    progress.last_logged_resource_percentage = int(percentage)
+                    if resources is None:
+                        resources = (
+                            time.strftime('%Y-%m-%d %H:%M:%S'),
+                            psutil.virtual_memory().percent,
+                            psutil.disk_usage('/').percent,
+                        )
+                    current_time, memory_percent, disk_percent = resources
+                    logger.info(f"[{current_time}] Memory Usage: {memory_percent}% used")
+                    logger.info(f"[{current_time}] Disk Usage: {disk_percent}% used")
 
         # Sleep for 1 second before the next update
         time.sleep(1)
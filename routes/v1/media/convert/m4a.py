@@ -15,20 +15,20 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 from flask import Blueprint, current_app
-from app_utils import validate_payload, queue_task_wrapper
+from app_utils import validate_payload, queue_task_wrapper, compile_schema
 import logging
 from services.v1.media.convert.m4a import process_audio_to_m4a
 from services.authentication import authenticate
 from services.cloud_storage import upload_file
+from security import rate_limit, concurrency_limit
+from config import M4A_RATE_LIMIT_PER_MINUTE, M4A_MAX_CONCURRENT, M4A_ALWAYS_QUEUE
 import os
 
 v1_m4a_bp = Blueprint('v1_m4a', __name__)
 logger = logging.getLogger(__name__)
 
-
-@v1_m4a_bp.route('/v1/media/convert/m4a', methods=['POST'])
-@authenticate
-@validate_payload({
+# Compiled at import so requests only run the prebuilt validator
+M4A_REQUEST_VALIDATOR = compile_schema({
     "type": "object",
     "properties": {
         "media_url": {"type": "string", "format": "uri"},
@@ -40,13 +40,23 @@ logger = logging.getLogger(__name__)
     "required": ["media_url"],
     "additionalProperties": False
 })
-@queue_task_wrapper(bypass_queue=False)
+
+
+@v1_m4a_bp.route('/v1/media/convert/m4a', methods=['POST'])
+@authenticate
+@rate_limit(max_per_minute=M4A_RATE_LIMIT_PER_MINUTE, burst=M4A_RATE_LIMIT_PER_MINUTE, key_by="api_key", scope="m4a")
+# Wraps the queue wrapper, so this caps inline conversions only: a queued job
+# releases its slot once enqueued and runs later under QUEUE_WORKERS
+@concurrency_limit(M4A_MAX_CONCURRENT, key_by="api_key", scope="m4a")
+@validate_payload(M4A_REQUEST_VALIDATOR)
+@queue_task_wrapper(bypass_queue=False, always_queue=M4A_ALWAYS_QUEUE)
 def convert_audio_to_m4a(job_id, data):
     """
     Handles both synchronous (no webhook_url) and asynchronous (with webhook_url) requests.
     If webhook_url is present, the existing async/queued pattern applies (the wrapper will manage queuing).
     If webhook_url is omitted, the request is processed synchronously and returns a JSON response
-    consistent with other media endpoints.
+    consistent with other media endpoints, unless M4A_ALWAYS_QUEUE is set: then it is queued as well
+    and the 202 job_id can be polled via /v1/toolkit/job/status.
     """
     media_url = data['media_url']
     metadata = data.get('metadata')
@@ -54,14 +64,14 @@ def convert_audio_to_m4a(job_id, data):
     webhook_url = data.get('webhook_url')
     client_id = data.get('id')
 
-    logger.info(f"Job {job_id}: Received audio-to-m4a request for media URL: {media_url}")
+    logger.info("Job %s: Received audio-to-m4a request for media URL: %s", job_id, media_url)
 
     try:
         output_file = process_audio_to_m4a(media_url, job_id, metadata=metadata, audio_options=audio_options, webhook_url=webhook_url)
-        logger.info(f"Job {job_id}: Audio to M4A conversion completed successfully: {output_file}")
+        logger.info("Job %s: Audio to M4A conversion completed successfully: %s", job_id, output_file)
 
         cloud_url = upload_file(output_file)
-        logger.info(f"Job {job_id}: Converted M4A uploaded to cloud storage: {cloud_url}")
+        logger.info("Job %s: Converted M4A uploaded to cloud storage: %s", job_id, cloud_url)
 
         # Build a consistent response payload (suitable for sync responses when no webhook is provided)
         response_payload = {
@@ -77,5 +87,5 @@ def convert_audio_to_m4a(job_id, data):
         return response_payload, "/v1/media/convert/m4a", 200
 
     except Exception as e:
-        logger.error(f"Job {job_id}: Error during audio to m4a conversion - {str(e)}")
+        logger.error("Job %s: Error during audio to m4a conversion - %s", job_id, e)
         return {"error": str(e)}, "/v1/media/convert/m4a", 500
\ No newline at end of file
@@ -2,6 +2,8 @@ from flask import Blueprint, send_from_directory, current_app, request, redirect
 import os
 import mimetypes
 import re
+import hashlib
+from functools import lru_cache
 from services.v1.media.feedback.feedback import get_feedback_path
 
 # Ensure correct MIME types for Next.js assets
@@ -12,6 +14,67 @@ mimetypes.add_type('font/woff2', '.woff2')
 # Base URL path for assets
 BASE_PATH = '/v1/media/feedback'
 
+def _rewrite_html(content):
+    content = content.replace('href="/_next/', f'href="{BASE_PATH}/_next/')
+    content = content.replace('src="/_next/', f'src="{BASE_PATH}/_next/')
+    content = content.replace('href="/favicon.ico', f'href="{BASE_PATH}/favicon.ico')
+    content = content.replace('href="/logo.png', f'href="{BASE_PATH}/logo.png')
+    content = content.replace('src="/logo.png', f'src="{BASE_PATH}/logo.png')
+    return content
+
+def _rewrite_js(content):
+    if '/_next/' not in content:
+        return None
+    content = content.replace('href:"/_next/', f'href:"{BASE_PATH}/_next/')
+    content = content.replace('src:"/_next/', f'src:"{BASE_PATH}/_next/')
+    return content
+
+def _rewrite_css(content):
+    if 'url(/_next/' not in content:
+        return None
+    return content.replace('url(/_next/', f'url({BASE_PATH}/_next/')
+
+_REWRITERS = {'html': _rewrite_html, 'js': _rewrite_js, 'css': _rewrite_css}
+
+# Content-Type and caching policy per rewritten asset kind. The page itself is
+# revalidated on every load (its ETag makes that a 304); the JS/CSS it references
+# may be reused by browsers and proxies for an hour
+_ASSET_CONTENT_TYPES = {'html': 'text/html', 'js': 'application/javascript', 'css': 'text/css'}
+_ASSET_CACHE_CONTROL = {'html': 'no-cache', 'js': 'public, max-age=3600', 'css': 'public, max-age=3600'}
+
+@lru_cache(maxsize=256)
+def _load_rewritten(full_path, mtime_ns, kind):
+    # mtime_ns is part of the cache key so an updated build is picked up
+    with open(full_path, 'r') as f:
+        content = _REWRITERS[kind](f.read())
+    if content is None:
+        return None
+    # Kept as the encoded body (plus its ETag) so responses reuse the bytes
+    # instead of re-encoding and re-hashing per request
+    body = content.encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()
+
+def _cached_rewrite(full_path, kind):
+    return _load_rewritten(full_path, os.stat(full_path).st_mtime_ns, kind)
+
+def rewritten_response(full_path, kind):
+    """
+    Response serving the asset at full_path with its paths rebased under
+    BASE_PATH, plus an ETag and Cache-Control, or None when it needs no
+    rewriting. The rewritten bytes are cached per file modification time, so
+    the static build is read and encoded once rather than on every request.
+    A request whose If-None-Match matches gets an empty 304 instead of the body.
+    """
+    cached = _cached_rewrite(full_path, kind)
+    if cached is None:
+        return None
+    body, etag = cached
+    response = make_response(body)
+    response.headers['Content-Type'] = _ASSET_CONTENT_TYPES[kind]
+    response.headers['Cache-Control'] = _ASSET_CACHE_CONTROL[kind]
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 v1_media_feedback_bp = Blueprint('v1_media_feedback', __name__, url_prefix='/v1/media/feedback', static_folder=None)
 
 def create_root_next_routes(app):
@@ -43,22 +106,8 @@ def serve_feedback_page():
         # Get the feedback static files directory path
         feedback_path = get_feedback_path()
         
-        # Read the HTML file content
-        with open(os.path.join(feedback_path, 'index.html'), 'r') as f:
-            content = f.read()
-        
-        # Fix paths in the HTML content to include the base path
-        # Replace resource paths
-        content = content.replace('href="/_next/', f'href="{BASE_PATH}/_next/')
-        content = content.replace('src="/_next/', f'src="{BASE_PATH}/_next/')
-        content = content.replace('href="/favicon.ico', f'href="{BASE_PATH}/favicon.ico')
-        content = content.replace('href="/logo.png', f'href="{BASE_PATH}/logo.png')
-        content = content.replace('src="/logo.png', f'src="{BASE_PATH}/logo.png')
-        
-        # Create response with modified content
-        response = make_response(content)
-        response.headers['Content-Type'] = 'text/html'
-        return response
+        # Serve the HTML with paths fixed to include the base path
+        return rewritten_response(os.path.join(feedback_path, 'index.html'), 'html')
     except Exception as e:
         current_app.logger.error(f"Error serving index.html: {str(e)}")
         return str(e), 'serve_feedback_page', 500
@@ -80,17 +129,9 @@ def serve_next_static(path):
         if ext == '.js':
             if os.path.exists(full_path):
                 try:
-                    with open(full_path, 'r') as f:
-                        content = f.read()
-                        
                     # Fix paths in JS files that might reference other assets
-                    if '/_next/' in content:
-                        content = content.replace('href:"/_next/', f'href:"{BASE_PATH}/_next/')
-                        content = content.replace('src:"/_next/', f'src:"{BASE_PATH}/_next/')
-                        
-                        # Create response with modified content
-                        response = make_response(content)
-                        response.headers['Content-Type'] = 'application/javascript'
+                    response = rewritten_response(full_path, 'js')
+                    if response is not None:
                         return response
                 except UnicodeDecodeError:
                     # If we can't read as text, serve as binary
@@ -141,33 +182,18 @@ def serve_feedback_static(filename):
         if ext == '.css':
             full_path = os.path.join(feedback_path, filename)
             if os.path.exists(full_path):
-                with open(full_path, 'r') as f:
-                    content = f.read()
-                
                 # Rewrite paths in CSS if needed
-                if 'url(/_next/' in content:
-                    content = content.replace('url(/_next/', f'url({BASE_PATH}/_next/')
-                    
-                    # Create response with modified content
-                    response = make_response(content)
-                    response.headers['Content-Type'] = 'text/css'
+                response = rewritten_response(full_path, 'css')
+                if response is not None:
                     return response
         
         # Handle JavaScript files
         if ext == '.js':
             full_path = os.path.join(feedback_path, filename)
             if os.path.exists(full_path):
-                with open(full_path, 'r') as f:
-                    content = f.read()
-                
                 # Rewrite paths in JS if needed
-                if '/_next/' in content:
-                    content = content.replace('href:"/_next/', f'href:"{BASE_PATH}/_next/')
-                    content = content.replace('src:"/_next/', f'src:"{BASE_PATH}/_next/')
-                    
-                    # Create response with modified content
-                    response = make_response(content)
-                    response.headers['Content-Type'] = 'application/javascript'
+                response = rewritten_response(full_path, 'js')
+                if response is not None:
                     return response
         
         # For image and other static files
@@ -105,10 +105,11 @@ def generate_ass_v1(job_id, data):
     canvas_width = data.get('canvas_width')
     canvas_height = data.get('canvas_height')
 
-    logger.info(f"Job {job_id}: Received ASS generation request for {media_url}")
-    logger.info(f"Job {job_id}: Settings received: {settings}")
-    logger.info(f"Job {job_id}: Replace rules received: {replace}")
-    logger.info(f"Job {job_id}: Exclude time ranges received: {exclude_time_ranges}")
+    # One lazily formatted record per request; the payload is only rendered when INFO is enabled
+    logger.info(
+        "Job %s: Received ASS generation request for %s - settings: %s, replace rules: %s, exclude time ranges: %s",
+        job_id, media_url, settings, replace, exclude_time_ranges
+    )
 
     try:
         output = generate_ass_captions_v1(
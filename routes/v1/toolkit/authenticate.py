@@ -16,20 +16,10 @@
 
 
 
-from flask import Blueprint, request, jsonify, current_app
-from app_utils import *
-from functools import wraps
-import os
+from flask import Blueprint
+from routes.authenticate import authenticate_endpoint
 
 v1_toolkit_auth_bp = Blueprint('v1_toolkit_auth', __name__)
 
-API_KEY = os.environ.get('API_KEY')
-
-@v1_toolkit_auth_bp.route('/v1/toolkit/authenticate', methods=['GET'])
-@queue_task_wrapper(bypass_queue=True)
-def authenticate_endpoint(**kwargs):
-    api_key = request.headers.get('X-API-Key')
-    if api_key == API_KEY:
-        return "Authorized", "/authenticate", 200
-    else:
-        return "Unauthorized", "/authenticate", 401
+# Same handler as /authenticate, registered under the v1 toolkit path
+v1_toolkit_auth_bp.add_url_rule('/v1/toolkit/authenticate', view_func=authenticate_endpoint, methods=['GET'])
@@ -17,7 +17,7 @@
 
 
 import os
-import json
+import orjson
 import logging
 from flask import Blueprint, request
 from config import LOCAL_STORAGE_PATH
@@ -54,8 +54,8 @@ def get_job_status(job_id, data):
             return {"error": "Job not found", "job_id": get_job_id}, endpoint, 404
         
         # Read the job status file
-        with open(job_file_path, 'r') as file:
-            job_status = json.load(file)
+        with open(job_file_path, 'rb') as file:
+            job_status = orjson.loads(file.read())
         
         # Return the job status file content directly
         return job_status, endpoint, 200
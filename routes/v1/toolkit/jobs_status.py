@@ -17,7 +17,7 @@
 
 
 import os
-import json
+import orjson
 import logging
 import time
 from flask import Blueprint, request
@@ -74,8 +74,8 @@ def get_all_jobs_status(job_id, data):
                     job_id = filename.split('.')[0]  # Remove .json extension to get job_id
                     
                     # Read the job status file
-                    with open(job_file_path, 'r') as file:
-                        job_data = json.load(file)
+                    with open(job_file_path, 'rb') as file:
+                        job_data = orjson.loads(file.read())
                         
                         # Only include the job_status field, not the response
                         if "job_status" in job_data:
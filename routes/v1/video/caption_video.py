@@ -115,10 +115,11 @@ def caption_video_v1(job_id, data):
     id = data.get('id')
     language = data.get('language', 'auto')
 
-    logger.info(f"Job {job_id}: Received v1 captioning request for {video_url}")
-    logger.info(f"Job {job_id}: Settings received: {settings}")
-    logger.info(f"Job {job_id}: Replace rules received: {replace}")
-    logger.info(f"Job {job_id}: Exclude time ranges received: {exclude_time_ranges}")
+    # One lazily formatted record per request; the payload is only rendered when INFO is enabled
+    logger.info(
+        "Job %s: Received v1 captioning request for %s - settings: %s, replace rules: %s, exclude time ranges: %s",
+        job_id, video_url, settings, replace, exclude_time_ranges
+    )
 
     try:
         # Do NOT combine position and alignment. Keep them separate.
@@ -15,26 +15,35 @@ Notes:
 
 from __future__ import annotations
 
+import hashlib
+import hmac
 import os
 import time
 import threading
-from collections import deque
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable, Deque, Dict, Tuple
+from typing import Callable, Dict, Tuple
 
-from flask import Request, Response, request, jsonify
+from flask import Request, Response, request
 
 
 # -----------------------------
 # Configuration via environment
 # -----------------------------
 
+ENABLE_RATE_LIMITING = os.environ.get("ENABLE_RATE_LIMITING", "true").lower() in {"1", "true", "yes"}
 RATE_LIMIT_PER_MINUTE = int(os.environ.get("RATE_LIMIT_PER_MINUTE", "100"))
 RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", str(max(100, RATE_LIMIT_PER_MINUTE))))
 RATE_LIMIT_KEY = os.environ.get("RATE_LIMIT_KEY", "ip").lower()  # "ip" or "api_key"
+# "token_bucket" (allows bursts up to RATE_LIMIT_BURST) or "sliding_window" (smooth per-60s cap)
+RATE_LIMIT_STRATEGY = os.environ.get("RATE_LIMIT_STRATEGY", "token_bucket").lower()
+# Upper bound on tracked clients; least recently seen ones are dropped beyond it
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
 
 ENABLE_SECURITY_HEADERS = os.environ.get("ENABLE_SECURITY_HEADERS", "true").lower() in {"1", "true", "yes"}
 ALLOWED_ORIGINS = os.environ.get("ALLOWED_ORIGINS", "").strip()  # CSV list; empty disables CORS header
+# Parsed once so each request is a single set lookup instead of a CSV re-split
+_ALLOWED_ORIGIN_SET = frozenset(o.strip() for o in ALLOWED_ORIGINS.split(",") if o.strip())
 
 
 # -----------------------------
@@ -45,19 +54,71 @@ def _get_client_ip(flask_request: Request) -> str:
     # Honor X-Forwarded-For (Cloud Run behind LB/Proxy)
     xff = flask_request.headers.get("X-Forwarded-For", "")
     if xff:
-        # First IP in the list is the original client
-        return xff.split(",")[0].strip()
+        # First IP in the list is the original client; partition stops at the
+        # first comma instead of splitting the whole proxy chain into a list
+        client = xff.partition(",")[0].strip()
+        if client:
+            return client
     return flask_request.remote_addr or "unknown"
 
 
-def _get_rate_limit_key(flask_request: Request) -> str:
-    if RATE_LIMIT_KEY == "api_key":
-        api_key = flask_request.headers.get("X-API-Key", "")
-        if api_key:
-            return f"api_key:{api_key}"
+def _key_by_ip(flask_request: Request) -> str:
     return f"ip:{_get_client_ip(flask_request)}"
 
 
+def _key_by_api_key(flask_request: Request) -> str:
+    api_key = flask_request.headers.get("X-API-Key", "")
+    if api_key:
+        return f"api_key:{api_key}"
+    return _key_by_ip(flask_request)
+
+
+_KEY_FUNCS: Dict[str, Callable[[Request], str]] = {"ip": _key_by_ip, "api_key": _key_by_api_key}
+
+
+def _per_request(key_fn: Callable[[Request], str], slot: str) -> Callable[[Request], str]:
+    """Remember key_fn's result in the WSGI environ for the rest of the request.
+
+    Routes stack rate_limit and concurrency_limit (m4a), so without this every
+    layer re-reads the same headers and rebuilds the same key string.
+    """
+
+    def _keyed(flask_request: Request) -> str:
+        environ = flask_request.environ
+        key = environ.get(slot)
+        if key is None:
+            key = environ[slot] = key_fn(flask_request)
+        return key
+
+    return _keyed
+
+
+_REQUEST_KEY_FUNCS: Dict[str, Callable[[Request], str]] = {
+    name: _per_request(fn, f"security.client_key.{name}") for name, fn in _KEY_FUNCS.items()
+}
+
+
+def _rate_limit_key_fn(key_by: str | None = None) -> Callable[[Request], str]:
+    """Pick the key function once, when a decorator is applied, not per request."""
+    return _REQUEST_KEY_FUNCS.get(key_by or RATE_LIMIT_KEY, _REQUEST_KEY_FUNCS["ip"])
+
+
+def _get_rate_limit_key(flask_request: Request, key_by: str | None = None) -> str:
+    return _KEY_FUNCS.get(key_by or RATE_LIMIT_KEY, _key_by_ip)(flask_request)
+
+
+def _json_message(body: bytes) -> Response:
+    return Response(body, mimetype="application/json")
+
+
+# Rejections are answered from fixed bodies rather than serialized per request,
+# which also keeps the 429 path cheap when a client is hammering a route
+_MISCONFIGURED_BODY = b'{"message":"Server misconfiguration: API_KEY not set"}'
+_UNAUTHORIZED_BODY = b'{"message":"Unauthorized"}'
+_TOO_MANY_REQUESTS_BODY = b'{"message":"Too Many Requests"}'
+_TOO_MANY_CONCURRENT_BODY = b'{"message":"Too Many Concurrent Requests"}'
+
+
 # -----------------------------
 # API Key Authentication
 # -----------------------------
@@ -67,17 +128,24 @@ def require_api_key(func: Callable) -> Callable:
 
     Reads expected key from the environment variable API_KEY to avoid importing
     config at module import time. This prevents startup failures if API_KEY is
-    not yet set while this module is merely imported.
+    not yet set while this module is merely imported. The key is read on the
+    first request that finds it set and reused afterwards, and is compared in
+    constant time.
     """
 
+    expected: list = []  # SHA-256 of API_KEY once it has been seen
+
     @wraps(func)
     def _wrapper(*args, **kwargs):
-        expected = os.environ.get("API_KEY", "")
-        provided = request.headers.get("X-API-Key", "")
         if not expected:
-            return jsonify({"message": "Server misconfiguration: API_KEY not set"}), 500
-        if provided != expected:
-            return jsonify({"message": "Unauthorized"}), 401
+            key = os.environ.get("API_KEY", "")
+            if not key:
+                return _json_message(_MISCONFIGURED_BODY), 500
+            expected.append(hashlib.sha256(key.encode()).digest())
+        provided = request.headers.get("X-API-Key", "")
+        # Fixed-size digests, so the compare does not depend on the key's length
+        if not hmac.compare_digest(hashlib.sha256(provided.encode()).digest(), expected[0]):
+            return _json_message(_UNAUTHORIZED_BODY), 401
         return func(*args, **kwargs)
 
     return _wrapper
@@ -87,52 +155,228 @@ def require_api_key(func: Callable) -> Callable:
 # Lightweight Rate Limiting
 # -----------------------------
 
-_rate_lock = threading.Lock()
-_rate_buckets: Dict[str, Deque[float]] = {}
+class _StripedBuckets:
+    """Per-key state split across shards that each have their own lock.
+
+    Requests for different clients usually land on different shards, so they
+    no longer queue behind one process-wide mutex. Each shard is kept in least
+    recently used order so idle entries can be dropped from the front.
+    """
+
+    def __init__(self, shards: int = 64, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self._mask = shards - 1  # shards must be a power of two
+        # Enforced per shard, so the total stays near max_keys without a global count
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._maps: list = [OrderedDict() for _ in range(shards)]
+
+    def shard(self, key: str) -> Tuple[threading.Lock, OrderedDict]:
+        index = hash(key) & self._mask
+        return self._locks[index], self._maps[index]
+
+    def clear(self) -> None:
+        for lock, buckets in zip(self._locks, self._maps):
+            with lock:
+                buckets.clear()
+
+
+# key -> small fixed-size list whose third item is the time the entry stops
+# mattering; a few numbers per client instead of a timestamp per request
+_rate_buckets = _StripedBuckets()
 
 
-def rate_limit(max_per_minute: int | None = None, burst: int | None = None) -> Callable:
-    """Sliding-window rate limit by IP or API key (configurable).
+def _evict_idle(buckets: OrderedDict, now: float, max_keys: int | None = None) -> None:
+    """Drop buckets that have refilled completely, oldest first.
 
-    - max_per_minute: allowed requests per 60s window (default from env)
-    - burst: maximum queued timestamps kept to bound memory (default from env)
+    A full bucket (or a window counter with nothing left to weigh) behaves exactly
+    like a missing one, so there is no need for a periodic sweep: each call pops from the least recently used end until it
+    reaches a bucket that is still refilling (at worst the one just used).
+    Beyond max_keys the least recently used buckets go regardless, so a flood
+    of spoofed X-Forwarded-For addresses cannot grow memory without bound.
+    """
+    if max_keys is not None:
+        while len(buckets) > max_keys:
+            buckets.popitem(last=False)
+    while buckets:
+        oldest = next(iter(buckets.values()))
+        if oldest[2] > now:
+            break
+        buckets.popitem(last=False)
+
+
+def _token_bucket(limit: int, capacity: float) -> Tuple[Callable, Callable]:
+    """State is [tokens, last_refill, full_at]; tokens refill at limit per minute."""
+    refill_per_second = limit / 60.0
+
+    def new_state(now: float) -> list:
+        return [capacity, now, now]
+
+    def consume(bucket: list, now: float) -> float:
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+        bucket[1] = now
+        if tokens < 1.0:
+            retry_after = (1.0 - tokens) / refill_per_second
+        else:
+            tokens -= 1.0
+            retry_after = 0.0
+        bucket[0] = tokens
+        bucket[2] = now + (capacity - tokens) / refill_per_second
+        return retry_after
+
+    return new_state, consume
+
+
+def _sliding_window(limit: int) -> Tuple[Callable, Callable]:
+    """State is [current_count, window, idle_at, previous_count] for fixed 60s windows.
+
+    The previous window's count is weighted by how much of it still overlaps
+    the trailing 60 seconds, approximating a sliding log with two integers.
+    """
+
+    def new_state(now: float) -> list:
+        return [0, int(now // 60), now, 0]
+
+    def consume(bucket: list, now: float) -> float:
+        window = int(now // 60)
+        if window != bucket[1]:
+            bucket[3] = bucket[0] if window == bucket[1] + 1 else 0
+            bucket[0] = 0
+            bucket[1] = window
+        elapsed = (now % 60) / 60
+        if bucket[3] * (1 - elapsed) + bucket[0] + 1 > limit:
+            if bucket[0] + 1 > limit or not bucket[3]:
+                retry_after = (window + 1) * 60 - now
+            else:
+                # Wait until enough of the previous window has slid out
+                needed = 1 - (limit - bucket[0] - 1) / bucket[3]
+                retry_after = (needed - elapsed) * 60
+        else:
+            bucket[0] += 1
+            retry_after = 0.0
+        # Counts stop mattering once they have slid out of the next window too
+        bucket[2] = (window + 2) * 60.0 if bucket[0] else (window + 1) * 60.0
+        return retry_after
+
+    return new_state, consume
+
+
+def rate_limit(
+    max_per_minute: int | None = None,
+    burst: int | None = None,
+    key_by: str | None = None,
+    scope: str | None = None,
+    strategy: str | None = None,
+) -> Callable:
+    """Per-client rate limit by IP or API key (configurable).
+
+    - max_per_minute: sustained requests per 60s (default from env)
+    - burst: token bucket capacity, i.e. requests allowed back to back (defaults
+      to RATE_LIMIT_BURST for the env-configured limit, else to max_per_minute)
+    - key_by: "ip" or "api_key"; overrides RATE_LIMIT_KEY for this route
+    - scope: gives the route its own buckets instead of sharing the global ones
+    - strategy: "token_bucket" or "sliding_window"; overrides RATE_LIMIT_STRATEGY
+
+    With ENABLE_RATE_LIMITING off, or a limit of zero or less, views are left
+    undecorated.
     """
 
-    limit = max_per_minute or RATE_LIMIT_PER_MINUTE
-    cap = burst or RATE_LIMIT_BURST
+    # An explicit 0 disables the limit, so only None falls back to the global default
+    limit = RATE_LIMIT_PER_MINUTE if max_per_minute is None else max_per_minute
+    if not ENABLE_RATE_LIMITING or limit <= 0:
+        # Disabled: hand back the view itself, with no per-request wrapper at all
+        return lambda func: func
+
+    key_prefix = f"{scope}|" if scope else ""
+    if (strategy or RATE_LIMIT_STRATEGY) == "sliding_window":
+        new_state, consume = _sliding_window(limit)
+        # The two strategies keep differently shaped state, so a client calling
+        # routes with different strategies must never share one entry
+        key_prefix += "window|"
+    else:
+        if burst is None:
+            burst = RATE_LIMIT_BURST if max_per_minute is None else limit
+        # A bucket must hold at least one token or it would refuse every request
+        capacity = float(max(1, burst))
+        new_state, consume = _token_bucket(limit, capacity)
+    key_fn = _rate_limit_key_fn(key_by)
 
     def _decorator(func: Callable) -> Callable:
         @wraps(func)
         def _wrapped(*args, **kwargs):
-            now = time.time()
-            key = _get_rate_limit_key(request)
-
-            with _rate_lock:
-                bucket = _rate_buckets.get(key)
+            key = key_prefix + key_fn(request)
+            # Monotonic: limits only need elapsed time, and a wall-clock step
+            # (NTP, VM resume) must not mint or withhold requests
+            now = time.monotonic()
+
+            lock, buckets = _rate_buckets.shard(key)
+            with lock:
+                bucket = buckets.get(key)
                 if bucket is None:
-                    bucket = deque()
-                    _rate_buckets[key] = bucket
+                    bucket = buckets[key] = new_state(now)
+                else:
+                    buckets.move_to_end(key)
+                retry_after = consume(bucket, now)
+                _evict_idle(buckets, now, _rate_buckets.max_keys_per_shard)
+
+            if retry_after:
+                return (
+                    _json_message(_TOO_MANY_REQUESTS_BODY),
+                    429,
+                    {"Retry-After": str(max(1, int(retry_after + 0.999)))},
+                )
+
+            return func(*args, **kwargs)
+
+        return _wrapped
+
+    return _decorator
+
+
+# -----------------------------
+# Concurrency Limiting
+# -----------------------------
+
+_inflight_lock = threading.Lock()
+_inflight: Dict[str, int] = {}
 
-                # Drop entries older than 60s
-                cutoff = now - 60.0
-                while bucket and bucket[0] < cutoff:
-                    bucket.popleft()
 
-                if len(bucket) >= limit:
-                    retry_after = max(1, int(bucket[0] - cutoff))
+def concurrency_limit(max_concurrent: int, key_by: str | None = None, scope: str | None = None) -> Callable:
+    """Cap simultaneous in-flight requests per IP or API key.
+
+    Rate limits bound how often a client may call a route, not how many calls it
+    may hold open at once; this rejects the request with 429 once the client
+    already has max_concurrent running. Slots are released when the wrapped view
+    returns or raises.
+    """
+
+    key_fn = _rate_limit_key_fn(key_by)
+
+    def _decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def _wrapped(*args, **kwargs):
+            key = key_fn(request)
+            if scope:
+                key = f"{scope}|{key}"
+
+            with _inflight_lock:
+                active = _inflight.get(key, 0)
+                if active >= max_concurrent:
                     return (
-                        jsonify({"message": "Too Many Requests"}),
+                        _json_message(_TOO_MANY_CONCURRENT_BODY),
                         429,
-                        {"Retry-After": str(retry_after)},
+                        {"X-Concurrency-Remaining": "0"},
                     )
-
-                # Record the request
-                bucket.append(now)
-                # Bound memory
-                while len(bucket) > cap:
-                    bucket.popleft()
-
-            return func(*args, **kwargs)
+                _inflight[key] = active + 1
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with _inflight_lock:
+                    remaining = _inflight[key] - 1
+                    if remaining:
+                        _inflight[key] = remaining
+                    else:
+                        del _inflight[key]
 
         return _wrapped
 
@@ -155,16 +399,27 @@ _SECURITY_HEADERS = {
 }
 
 
-def add_security_headers(response: Response) -> Response:
-    if ENABLE_SECURITY_HEADERS:
-        for k, v in _SECURITY_HEADERS.items():
-            response.headers.setdefault(k, v)
+# Resolved once at import: the (lowercased name, name, value) triples every
+# response gets, or nothing at all when ENABLE_SECURITY_HEADERS is off
+_SECURITY_HEADER_ITEMS: Tuple[Tuple[str, str, str], ...] = (
+    tuple((k.lower(), k, v) for k, v in _SECURITY_HEADERS.items()) if ENABLE_SECURITY_HEADERS else ()
+)
 
-    if ALLOWED_ORIGINS:
+
+def add_security_headers(response: Response) -> Response:
+    if _SECURITY_HEADER_ITEMS:
+        hdrs = response.headers
+        # One pass over the response's headers instead of a case-insensitive
+        # scan per setdefault; headers the view set itself are left alone
+        present = {k.lower() for k in hdrs.keys()}
+        for lowered, k, v in _SECURITY_HEADER_ITEMS:
+            if lowered not in present:
+                hdrs.add(k, v)
+
+    if _ALLOWED_ORIGIN_SET:
         # Basic CORS allowlist
         origin = request.headers.get("Origin", "")
-        allowed = {o.strip() for o in ALLOWED_ORIGINS.split(",") if o.strip()}
-        if origin and origin in allowed:
+        if origin in _ALLOWED_ORIGIN_SET:
             response.headers.setdefault("Access-Control-Allow-Origin", origin)
             response.headers.setdefault("Vary", "Origin")
             response.headers.setdefault("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
@@ -175,6 +430,10 @@ def add_security_headers(response: Response) -> Response:
 def register_security(app) -> None:
     """Attach after_request hook for headers/CORS."""
 
+    if not _SECURITY_HEADER_ITEMS and not _ALLOWED_ORIGIN_SET:
+        # Nothing to add to any response, so skip the per-request hook entirely
+        return
+
     @app.after_request
     def _after(resp: Response) -> Response:  # type: ignore[override]
         return add_security_headers(resp)
@@ -6,6 +6,8 @@ Auto-detects CUDA availability and optimizes compute type accordingly.
 
 import os
 import time
+import shutil
+import importlib.util
 import logging
 import threading
 import numpy as np
@@ -33,6 +35,7 @@ from config import (
     ASR_NUM_WORKERS,
     ASR_VAD_MIN_SILENCE_MS,
     ASR_CACHE_DIR,
+    ASR_SHM_CACHE_DIR,
     LOCAL_STORAGE_PATH,
     ENABLE_OPENAI_WHISPER,
     ASR_PROFILE,
@@ -49,13 +52,21 @@ except ImportError as e:
     WhisperModel = None
     logger.warning(f"Failed to load faster_whisper_loader: {e}")
 
-# Try to import torch for CUDA detection
-try:
-    import torch
-    TORCH_AVAILABLE = True
-except ImportError:
-    TORCH_AVAILABLE = False
+# PyTorch is only used to probe for CUDA and importing it takes seconds, so it is
+# imported on first use and never when ASR_DEVICE already names the device
+TORCH_AVAILABLE = importlib.util.find_spec('torch') is not None
+if not TORCH_AVAILABLE:
     logger.info("PyTorch not available. Will use CPU for inference.")
+_torch = None
+
+
+def _import_torch():
+    """Import torch on first use and reuse the module afterwards."""
+    global _torch
+    if _torch is None:
+        import torch
+        _torch = torch
+    return _torch
 
 # Module-level variables for singleton pattern
 _model: Optional['WhisperModel'] = None
@@ -75,6 +86,7 @@ def detect_cuda_availability() -> tuple[bool, str, int]:
         return False, "N/A", 0
     
     try:
+        torch = _import_torch()
         cuda_available = torch.cuda.is_available()
         if cuda_available:
             cuda_version = torch.version.cuda or "Unknown"
@@ -194,6 +206,41 @@ def warm_up_model(model: 'WhisperModel') -> float:
         return warm_up_time
 
 
+def use_shared_memory_cache(model_cache_dir: str) -> str:
+    """
+    Mirror the model cache into ASR_SHM_CACHE_DIR and return the directory to load from.
+    
+    The copy is made once per tmpfs; every later worker or container sharing it
+    reads the weights from RAM instead of disk. Falls back to model_cache_dir if
+    shared memory is not configured or the copy fails.
+    """
+    if not ASR_SHM_CACHE_DIR:
+        return model_cache_dir
+    
+    shm_dir = os.path.join(ASR_SHM_CACHE_DIR, os.path.basename(os.path.normpath(model_cache_dir)))
+    if os.path.isdir(shm_dir) and os.listdir(shm_dir):
+        logger.info(f"Loading model files from shared memory cache: {shm_dir}")
+        return shm_dir
+    if not os.path.isdir(model_cache_dir) or not os.listdir(model_cache_dir):
+        # Nothing downloaded yet; let faster-whisper download straight into shared memory
+        os.makedirs(shm_dir, exist_ok=True)
+        logger.info(f"Downloading model files into shared memory cache: {shm_dir}")
+        return shm_dir
+    
+    # Copy into a temporary sibling and rename, so concurrent workers never see a partial copy
+    tmp_dir = f"{shm_dir}.{os.getpid()}.tmp"
+    try:
+        shutil.copytree(model_cache_dir, tmp_dir, symlinks=True)
+        os.rename(tmp_dir, shm_dir)
+        logger.info(f"Populated shared memory cache {shm_dir} from {model_cache_dir}")
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (os.path.isdir(shm_dir) and os.listdir(shm_dir)):
+            logger.warning(f"Could not populate shared memory cache {shm_dir}: {e}")
+            return model_cache_dir
+    return shm_dir
+
+
 def load_model(force_reload: bool = False) -> Optional['WhisperModel']:
     """
     Load the Whisper model with singleton pattern.
@@ -339,6 +386,8 @@ def load_model(force_reload: bool = False) -> Optional['WhisperModel']:
                 model_cache_dir = str(cache_dir)
                 logger.info(f"Using standard cache directory: {model_cache_dir}")
             
+            model_cache_dir = use_shared_memory_cache(model_cache_dir)
+            
             _model = WhisperModel(
                 model_name,
                 device=device,
@@ -417,9 +466,9 @@ def unload_model() -> None:
             _model_config = {}
             
             # Try to free GPU memory if using CUDA
-            if TORCH_AVAILABLE:
+            if _torch is not None:
                 try:
-                    torch.cuda.empty_cache()
+                    _torch.cuda.empty_cache()
                     logger.info("Cleared CUDA cache")
                 except:
                     pass
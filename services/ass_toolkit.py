@@ -23,7 +23,8 @@ import subprocess
 from datetime import timedelta
 import srt
 import re
-from services.file_management import download_file
+from functools import lru_cache
+from services.file_management import download_file, response_text
 from services.cloud_storage import upload_file  # Ensure this import is present
 import requests  # Ensure requests is imported for webhook handling
 from urllib.parse import urlparse
@@ -159,10 +160,18 @@ def format_ass_time(seconds):
     centiseconds = int(round((seconds - int(seconds)) * 100))
     return f"{hours}:{minutes:02}:{secs:02}.{centiseconds:02}"
 
+@lru_cache(maxsize=64)
+def _replacement_patterns(replace_items):
+    """Compile the case-insensitive patterns for one replace list, once."""
+    return tuple((re.compile(re.escape(old_word), re.IGNORECASE), new_word) for old_word, new_word in replace_items)
+
 def process_subtitle_text(text, replace_dict, all_caps, max_words_per_line):
     """Apply text transformations: replacements, all caps, and optional line splitting."""
-    for old_word, new_word in replace_dict.items():
-        text = re.sub(re.escape(old_word), new_word, text, flags=re.IGNORECASE)
+    # Called for every word or line, so the patterns are escaped and compiled
+    # once per replace list instead of on each call
+    if replace_dict:
+        for pattern, new_word in _replacement_patterns(tuple(replace_dict.items())):
+            text = pattern.sub(new_word, text)
     if all_caps:
         text = text.upper()
     if max_words_per_line > 0:
@@ -173,15 +182,16 @@ def process_subtitle_text(text, replace_dict, all_caps, max_words_per_line):
 
 def srt_to_transcription_result(srt_content):
     """Convert SRT content into a transcription-like structure for uniform processing."""
-    subtitles = list(srt.parse(srt_content))
-    segments = []
-    for sub in subtitles:
-        segments.append({
+    # Built in one comprehension straight off the parser, without materialising the subtitles first
+    segments = [
+        {
             'start': sub.start.total_seconds(),
             'end': sub.end.total_seconds(),
             'text': sub.content.strip(),
             'words': []  # SRT does not provide word-level timestamps
-        })
+        }
+        for sub in srt.parse(srt_content)
+    ]
     logger.info("Converted SRT content to transcription result.")
     return {'segments': segments}
 
@@ -208,7 +218,7 @@ def download_captions(captions_url):
         response = requests.get(captions_url)
         response.raise_for_status()
         logger.info("Captions downloaded successfully.")
-        return response.text
+        return response_text(response)
     except Exception as e:
         logger.error(f"Error downloading captions: {str(e)}")
         raise
@@ -687,13 +697,13 @@ def process_subtitle_events(transcription_result, style_type, settings, replace_
     """
     return srt_to_ass(transcription_result, style_type, settings, replace_dict, video_resolution)
 
+TIME_STRING_RE = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{2}(?:\.\d{1,3})?)$")
+
 def parse_time_string(time_str):
     """Parse a time string in hh:mm:ss.ms or mm:ss.ms or ss.ms format to seconds (float)."""
-    import re
     if not isinstance(time_str, str):
         raise ValueError("Time value must be a string in hh:mm:ss.ms format.")
-    pattern = r"^(?:(\d+):)?(\d{1,2}):(\d{2}(?:\.\d{1,3})?)$"
-    match = re.match(pattern, time_str)
+    match = TIME_STRING_RE.match(time_str)
     if not match:
         # Try ss.ms only
         try:
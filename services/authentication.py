@@ -16,16 +16,28 @@
 
 
 
+import hmac
+import hashlib
 from functools import wraps
 from flask import request, jsonify
 from config import API_KEY
 
+# Digested once; comparing fixed-size SHA-256 digests also keeps the key's
+# length out of the timing of the constant-time compare
+_API_KEY_DIGEST = hashlib.sha256(API_KEY.encode()).digest()
+
+def is_valid_api_key(api_key):
+    """Constant-time check of a provided X-API-Key value against API_KEY."""
+    if not api_key:
+        return False
+    return hmac.compare_digest(hashlib.sha256(api_key.encode()).digest(), _API_KEY_DIGEST)
+
 def authenticate(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         api_key = request.headers.get('X-API-Key')
         
-        if api_key != API_KEY:
+        if not is_valid_api_key(api_key):
             return jsonify({"message": "Unauthorized"}), 401
         return func(*args, **kwargs)
     return wrapper
@@ -21,7 +21,7 @@ import ffmpeg
 import logging
 import requests
 import subprocess
-from services.file_management import download_file
+from services.file_management import download_file, response_text
 
 # Set the default local storage directory
 STORAGE_PATH = "/tmp/"
@@ -139,7 +139,7 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
                 with open(srt_path, 'wb') as srt_file:
                     srt_file.write(response.content)
             else:
-                subtitle_content = caption_style + response.text
+                subtitle_content = caption_style + response_text(response)
                 with open(srt_path, 'w') as srt_file:
                     srt_file.write(subtitle_content)
             logger.info(f"Job {job_id}: Caption file downloaded to {srt_path}")
@@ -19,8 +19,9 @@
 import os
 import logging
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from services.gcp_toolkit import upload_to_gcs
-from services.s3_toolkit import upload_to_s3
+from services.s3_toolkit import upload_to_s3, preconnect as s3_preconnect
 from config import validate_env_vars
 from urllib.parse import urlparse
 
@@ -43,6 +44,10 @@ class CloudStorageProvider(ABC):
     def upload_file(self, file_path: str) -> str:
         pass
 
+    def preconnect(self) -> None:
+        """Warm up the connection to the storage backend; optional for providers."""
+        pass
+
 class GCPStorageProvider(CloudStorageProvider):
     def __init__(self):
         self.bucket_name = os.getenv('GCP_BUCKET_NAME')
@@ -86,8 +91,25 @@ class S3CompatibleProvider(CloudStorageProvider):
     def upload_file(self, file_path: str) -> str:
         return upload_to_s3(file_path, self.endpoint_url, self.access_key, self.secret_key, self.bucket_name, self.region)
 
+    def preconnect(self) -> None:
+        s3_preconnect(self.endpoint_url, self.access_key, self.secret_key, self.region, self.bucket_name)
+
+# Everything provider selection and construction reads from the environment
+_STORAGE_ENV_VARS = (
+    'S3_ENDPOINT_URL', 'S3_ACCESS_KEY', 'S3_SECRET_KEY', 'S3_BUCKET_NAME', 'S3_REGION',
+    'GCP_BUCKET_NAME', 'GCP_SA_CREDENTIALS', 'GCP_SA_KEY_BASE64',
+)
+
 def get_storage_provider() -> CloudStorageProvider:
-    
+    """Provider for the configured storage backend, reused while its settings are unchanged."""
+    environ = os.environ
+    return _storage_provider(tuple(environ.get(name) for name in _STORAGE_ENV_VARS))
+
+@lru_cache(maxsize=1)
+def _storage_provider(settings) -> CloudStorageProvider:
+    # settings only keys the cache: every upload used to re-validate the
+    # environment and rebuild (and, for DigitalOcean, re-parse and re-log) the provider.
+    # Failures raise, so they are not cached and are retried on the next call
     if os.getenv('S3_ENDPOINT_URL'):
 
         if ('digitalocean' in os.getenv('S3_ENDPOINT_URL').lower()):
@@ -105,6 +127,13 @@ def get_storage_provider() -> CloudStorageProvider:
     
     raise ValueError(f"No cloud storage settings provided.")
 
+def preconnect_storage() -> None:
+    """Start warming the configured storage backend's connection, if any is configured."""
+    try:
+        get_storage_provider().preconnect()
+    except Exception as e:
+        logger.debug(f"Skipping storage preconnect: {e}")
+
 def upload_file(file_path: str) -> str:
     provider = get_storage_provider()
     try:
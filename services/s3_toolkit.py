@@ -19,26 +19,70 @@
 import os
 import boto3
 import logging
+import threading
+from functools import lru_cache
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 from urllib.parse import urlparse, quote
 
 logger = logging.getLogger(__name__)
 
-def upload_to_s3(file_path, s3_url, access_key, secret_key, bucket_name, region):
-    # Parse the S3 URL into bucket, region, and endpoint
-    #bucket_name, region, endpoint_url = parse_s3_url(s3_url)
-    
+S3_UPLOAD_CONCURRENCY = int(os.environ.get('S3_UPLOAD_CONCURRENCY', '10'))
+
+# Multipart settings for uploads: parts are read from disk and sent in parallel
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=int(os.environ.get('S3_MULTIPART_CHUNKSIZE_MB', '16')) * 1024 * 1024,
+    max_concurrency=S3_UPLOAD_CONCURRENCY,
+    use_threads=True
+)
+
+@lru_cache(maxsize=8)
+def get_s3_client(endpoint_url, access_key, secret_key, region):
+    """Return a shared S3 client for these credentials.
+
+    boto3 clients are thread-safe, so one client (and its connection pool) is
+    reused across uploads instead of paying for a new session and TLS handshake
+    on every call. The pool is sized to cover the parallel multipart parts.
+    """
     session = boto3.Session(
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
         region_name=region
     )
+    config = Config(max_pool_connections=max(10, S3_UPLOAD_CONCURRENCY))
+    return session.client('s3', endpoint_url=endpoint_url, config=config)
+
+def preconnect(endpoint_url, access_key, secret_key, region, bucket_name):
+    """Open a pooled connection to the endpoint in the background.
+
+    The TCP/TLS handshake then happens before the first upload instead of
+    during it. Failures are only logged; the first upload simply connects itself.
+    """
+    def warm():
+        try:
+            get_s3_client(endpoint_url, access_key, secret_key, region).head_bucket(Bucket=bucket_name)
+        except Exception as e:
+            logger.debug(f"S3 preconnect to {endpoint_url} did not complete: {e}")
+
+    threading.Thread(target=warm, name='s3-preconnect', daemon=True).start()
+
+def upload_to_s3(file_path, s3_url, access_key, secret_key, bucket_name, region):
+    # Parse the S3 URL into bucket, region, and endpoint
+    #bucket_name, region, endpoint_url = parse_s3_url(s3_url)
     
-    client = session.client('s3', endpoint_url=s3_url)
+    client = get_s3_client(s3_url, access_key, secret_key, region)
 
     try:
-        # Upload the file to the specified S3 bucket
-        with open(file_path, 'rb') as data:
-            client.upload_fileobj(data, bucket_name, os.path.basename(file_path), ExtraArgs={'ACL': 'public-read'})
+        # Upload the file to the specified S3 bucket. upload_file (rather than upload_fileobj)
+        # lets each worker thread seek to and read its own part instead of buffering sequentially
+        client.upload_file(
+            file_path,
+            bucket_name,
+            os.path.basename(file_path),
+            ExtraArgs={'ACL': 'public-read'},
+            Config=S3_TRANSFER_CONFIG
+        )
 
         # URL encode the filename for the URL
         encoded_filename = quote(os.path.basename(file_path))
@@ -18,11 +18,14 @@
 
 import os
 import subprocess
-import json
+import orjson
 import re
 from services.file_management import download_file
 from config import LOCAL_STORAGE_PATH
 
+# Matches subtitles='<url>' or subtitles="<url>" inside a filter string
+SUBTITLES_URL_RE = re.compile(r"subtitles=['\"]([^'\"]+)")
+
 def get_extension_from_format(format_name):
     # Mapping of common format names to file extensions
     format_to_extension = {
@@ -77,7 +80,7 @@ def get_metadata(filename, metadata_requests, job_id):
             filename
         ]
         result = subprocess.run(ffprobe_command, capture_output=True, text=True)
-        probe_data = json.loads(result.stdout)
+        probe_data = orjson.loads(result.stdout)
         
         if metadata_requests.get('duration'):
             metadata['duration'] = float(probe_data['format']['duration'])
@@ -130,8 +133,7 @@ def process_ffmpeg_compose(data, job_id):
                 subtitles_paths.append(local_path)
                 fixed_path = local_path.replace('\\', '/')
                 return f"subtitles='{fixed_path}"  # keep the opening quote
-            # Regex: subtitles='<url>' or subtitles="<url>"
-            filter_str = re.sub(r"subtitles=['\"]([^'\"]+)", replace_subtitles_url, filter_str)
+            filter_str = SUBTITLES_URL_RE.sub(replace_subtitles_url, filter_str)
             new_filters.append(filter_str)
         filter_complex = ";".join(new_filters)
         command.extend(["-filter_complex", filter_complex])
@@ -30,7 +30,6 @@ import os
 import subprocess
 import logging
 import threading
-import time
 from services.file_management import download_file
 from config import LOCAL_STORAGE_PATH
 from app_utils import log_job_status
@@ -172,28 +171,28 @@ def process_audio_to_m4a(media_url, job_id, metadata=None, audio_options=None, w
         progress_thread.daemon = True
         progress_thread.start()
  
-        # Monitor process with timeout
-        start_time = time.time()
-        while True:
-            ret = process.poll()
-            if ret is not None:
-                break
-            elapsed = time.time() - start_time
-            if elapsed > timeout_seconds:
-                logger.error(f"Job {job_id}: FFmpeg exceeded timeout ({timeout_seconds}s), terminating")
-                process.terminate()
-                try:
-                    process.wait(5)
-                except Exception:
-                    process.kill()
-                raise Exception(f"FFmpeg conversion timed out after {timeout_seconds} seconds")
-            time.sleep(1)
+        # Drain stderr concurrently so a chatty ffmpeg cannot fill the pipe and stall
+        stderr_chunks = []
+        stderr_thread = threading.Thread(target=lambda: stderr_chunks.extend(process.stderr))
+        stderr_thread.daemon = True
+        stderr_thread.start()
  
-        # Capture remaining output
+        # Block until ffmpeg exits (or the timeout expires) instead of polling once a second
         try:
-            stdout, stderr = process.communicate(timeout=5)
-        except Exception:
-            stdout, stderr = "", ""
+            process.wait(timeout=timeout_seconds)
+        except subprocess.TimeoutExpired:
+            logger.error(f"Job {job_id}: FFmpeg exceeded timeout ({timeout_seconds}s), terminating")
+            process.terminate()
+            try:
+                process.wait(5)
+            except Exception:
+                process.kill()
+            raise Exception(f"FFmpeg conversion timed out after {timeout_seconds} seconds")
+ 
+        # Capture remaining output
+        progress_thread.join(timeout=5)
+        stderr_thread.join(timeout=5)
+        stdout, stderr = "", "".join(stderr_chunks)
  
         if process.returncode != 0:
             stderr_text = stderr or ""
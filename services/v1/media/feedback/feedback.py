@@ -1,8 +1,13 @@
 import os
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def get_feedback_path():
     """
     Returns the absolute path to the feedback static files directory
+
+    The path never changes for the process, so it is resolved (and the
+    directory created) on the first call and reused by every asset request.
     """
     # Define the path to the static feedback site files
     # Keeping files isolated in the feedback module directory
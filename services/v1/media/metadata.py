@@ -18,7 +18,7 @@
 
 import os
 import subprocess
-import json
+import orjson
 import logging
 from services.file_management import download_file
 from config import LOCAL_STORAGE_PATH
@@ -69,7 +69,7 @@ def get_media_metadata(media_url, job_id=None):
             logger.error(f"Error during ffprobe: {result.stderr}")
             raise Exception(f"ffprobe error: {result.stderr}")
             
-        probe_data = json.loads(result.stdout)
+        probe_data = orjson.loads(result.stdout)
         
         # Get format information
         if 'format' in probe_data:
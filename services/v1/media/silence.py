@@ -26,6 +26,10 @@ from config import LOCAL_STORAGE_PATH
 
 # Set up logging
 logger = logging.getLogger(__name__)
+
+# Regular expressions to match the silence detection output
+SILENCE_START_RE = re.compile(r'silence_start: (\d+\.?\d*)')
+SILENCE_END_RE = re.compile(r'silence_end: (\d+\.?\d*) \| silence_duration: (\d+\.?\d*)')
 logging.basicConfig(level=logging.INFO)
 
 def detect_silence(media_url, start_time=None, end_time=None, noise_threshold="-30dB", min_duration=0.5, mono=False, job_id=None):
@@ -107,15 +111,11 @@ def detect_silence(media_url, start_time=None, end_time=None, noise_threshold="-
         # Parse the silence detection output
         silence_intervals = []
         
-        # Regular expressions to match the silence detection output
-        silence_start_pattern = r'silence_start: (\d+\.?\d*)'
-        silence_end_pattern = r'silence_end: (\d+\.?\d*) \| silence_duration: (\d+\.?\d*)'
-        
         # Find all silence start times
-        silence_starts = re.findall(silence_start_pattern, result.stderr)
+        silence_starts = SILENCE_START_RE.findall(result.stderr)
         
         # Find all silence end times and durations
-        silence_ends_durations = re.findall(silence_end_pattern, result.stderr)
+        silence_ends_durations = SILENCE_END_RE.findall(result.stderr)
         
         # Combine the results into a list of silence intervals
         for i, (end, duration) in enumerate(silence_ends_durations):
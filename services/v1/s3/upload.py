@@ -17,29 +17,23 @@
 
 
 import os
-import boto3
 import logging
 import requests
 from urllib.parse import urlparse, unquote, quote
 import uuid
 import re
+from services.s3_toolkit import get_s3_client as _get_cached_s3_client
 
 logger = logging.getLogger(__name__)
 
 def get_s3_client():
-    """Create and return an S3 client using environment variables."""
+    """Return the shared S3 client for the credentials in the environment."""
     endpoint_url = os.getenv('S3_ENDPOINT_URL')
     access_key = os.getenv('S3_ACCESS_KEY')
     secret_key = os.getenv('S3_SECRET_KEY')
     region = os.environ.get('S3_REGION', '')
     
-    session = boto3.Session(
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name=region
-    )
-    
-    return session.client('s3', endpoint_url=endpoint_url)
+    return _get_cached_s3_client(endpoint_url, access_key, secret_key, region)
 
 def get_filename_from_url(url):
     """Extract filename from URL."""
@@ -52,6 +46,22 @@ def get_filename_from_url(url):
     
     return filename
 
+def read_part(stream, size):
+    """Read exactly size bytes from stream, or fewer only at end of stream."""
+    data = stream.read(size)
+    if not data or len(data) == size:
+        return data
+    # Short read: keep reading so only the final part falls below the S3 minimum
+    pieces = [data]
+    remaining = size - len(data)
+    while remaining:
+        data = stream.read(remaining)
+        if not data:
+            break
+        pieces.append(data)
+        remaining -= len(data)
+    return b''.join(pieces)
+
 def stream_upload_to_s3(file_url, custom_filename=None, make_public=False, download_headers=None):
     """
     Stream a file from a URL directly to S3 without saving to disk.
@@ -94,51 +104,34 @@ def stream_upload_to_s3(file_url, custom_filename=None, make_public=False, downl
         # Stream the file from URL
         response = requests.get(file_url, stream=True, headers=download_headers)
         response.raise_for_status()
+        response.raw.decode_content = True
         
-        # Process in chunks using multipart upload
+        # Each part is read straight off the socket at full part size, instead of
+        # gathering 1MB iter_content chunks and copying them into a growing buffer
         chunk_size = 5 * 1024 * 1024  # 5MB chunks (AWS minimum)
         parts = []
         part_number = 1
         
-        buffer = bytearray()
-        
-        for chunk in response.iter_content(chunk_size=1024 * 1024):  # 1MB read chunks
-            buffer.extend(chunk)
+        while True:
+            body = read_part(response.raw, chunk_size)
+            if not body:
+                break
             
-            # When we have enough data for a part, upload it
-            if len(buffer) >= chunk_size:
-                logger.info(f"Uploading part {part_number}")
-                part = s3_client.upload_part(
-                    Bucket=bucket_name,
-                    Key=filename,
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                    Body=buffer
-                )
-                
-                parts.append({
-                    'PartNumber': part_number,
-                    'ETag': part['ETag']
-                })
-                
-                part_number += 1
-                buffer = bytearray()
-        
-        # Upload any remaining data as the final part
-        if buffer:
-            logger.info(f"Uploading final part {part_number}")
+            logger.info(f"Uploading part {part_number}")
             part = s3_client.upload_part(
                 Bucket=bucket_name,
                 Key=filename,
                 PartNumber=part_number,
                 UploadId=upload_id,
-                Body=buffer
+                Body=body
             )
             
             parts.append({
                 'PartNumber': part_number,
                 'ETag': part['ETag']
             })
+            
+            part_number += 1
         
         # Complete the multipart upload
         logger.info("Completing multipart upload")
@@ -16,17 +16,171 @@
 
 
 
+import time
 import requests
 import logging
+import threading
+import orjson
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    WEBHOOK_TIMEOUT, WEBHOOK_BREAKER_THRESHOLD, WEBHOOK_BREAKER_COOLDOWN,
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE
+)
+from app_utils import ORJSON_OPTIONS
 
 logger = logging.getLogger(__name__)
 
+# Shared session so repeated deliveries reuse keep-alive connections
+# instead of paying a fresh TCP/TLS handshake for every job
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+# Never store cookies: the session delivers webhooks for every tenant
+_SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+class CircuitBreaker:
+    """
+    Per-key circuit breaker.
+    
+    After `threshold` consecutive failures a key is open and allow() refuses it
+    until `cooldown` seconds have passed; then a single call is let through
+    (half-open). Its success closes the circuit, its failure re-opens it, and
+    release() lets another call probe when it ended without an outcome.
+    A threshold of 0 or less disables the breaker.
+    """
+    
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = {}  # key -> [consecutive failures, opened_at, probe in flight]
+    
+    def allow(self, key):
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            entry = self._failures.get(key)
+            if entry is None or entry[0] < self.threshold:
+                return True
+            if not entry[2] and time.monotonic() - entry[1] >= self.cooldown:
+                entry[2] = True
+                return True
+            return False
+    
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+    
+    def release(self, key):
+        with self._lock:
+            entry = self._failures.get(key)
+            if entry is not None:
+                entry[2] = False
+    
+    def record_failure(self, key):
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            entry = self._failures.setdefault(key, [0, 0.0, False])
+            entry[0] += 1
+            if entry[0] >= self.threshold:
+                entry[1] = time.monotonic()
+                entry[2] = False
+    
+    def state(self, key):
+        with self._lock:
+            entry = self._failures.get(key)
+            if entry is None or entry[0] < self.threshold:
+                return 'closed'
+            return 'half_open' if entry[2] else 'open'
+
+# Receivers that keep timing out or erroring are skipped for a while instead of
+# tying up a webhook worker for the full timeout and retries on every job.
+# Keyed on the full URL: tenants often share a host (n8n, Zapier, Make), and
+# one tenant's broken endpoint must not drop everyone else's notifications
+_BREAKER = CircuitBreaker(WEBHOOK_BREAKER_THRESHOLD, WEBHOOK_BREAKER_COOLDOWN)
+
 def send_webhook(webhook_url, data):
     """Send a POST request to a webhook URL with the provided data."""
+    if not _BREAKER.allow(webhook_url):
+        logger.error("Webhook skipped: circuit open for %s after repeated failures", webhook_url)
+        return
+    # None until the receiver is contacted: a payload we cannot encode says nothing about it
+    receiver_ok = None
     try:
-        logger.info(f"Attempting to send webhook to {webhook_url} with data: {data}")
-        response = requests.post(webhook_url, json=data)
+        # %-style arguments so the (possibly large) payload is only formatted when INFO is enabled
+        logger.info("Attempting to send webhook to %s with data: %s", webhook_url, data)
+        # Encode with orjson (same encoder as the API responses) rather than requests' stdlib json
+        body = orjson.dumps(data, option=ORJSON_OPTIONS)
+        receiver_ok = False
+        response = _SESSION.post(
+            webhook_url,
+            data=body,
+            headers={'Content-Type': 'application/json'},
+            timeout=WEBHOOK_TIMEOUT
+        )
+        # A 4xx still means the receiver is up; only 5xx counts against the circuit
+        receiver_ok = response.status_code < 500
         response.raise_for_status()
-        logger.info(f"Webhook sent: {data}")
-    except requests.RequestException as e:
-        logger.error(f"Webhook failed: {e}")
+        logger.info("Webhook sent: %s", data)
+    except (requests.RequestException, orjson.JSONEncodeError) as e:
+        logger.error("Webhook failed: %s", e)
+    finally:
+        # Every exit settles the call, so a half-open probe can never stay in flight
+        if receiver_ok is None:
+            _BREAKER.release(webhook_url)
+        elif receiver_ok:
+            _BREAKER.record_success(webhook_url)
+        else:
+            _BREAKER.record_failure(webhook_url)
+
+class WebhookBatcher:
+    """
+    Coalesce webhook payloads for the same URL that complete within a short window.
+    
+    The first payload for a URL starts a timer; everything that arrives for that URL
+    before it fires is delivered together as {"batch": [...]}. A window holding a
+    single payload is delivered as the plain object, exactly as without batching.
+    """
+    
+    def __init__(self, window, dispatch):
+        """
+        Args:
+            window (float): Seconds to wait for more payloads before flushing a URL
+            dispatch (callable): Called as dispatch(url, body) to deliver a flushed batch
+        """
+        self.window = window
+        self._dispatch = dispatch
+        self._lock = threading.Lock()
+        self._pending = {}
+    
+    def enqueue(self, webhook_url, data):
+        with self._lock:
+            items = self._pending.setdefault(webhook_url, [])
+            items.append(data)
+            start_timer = len(items) == 1
+        if start_timer:
+            timer = threading.Timer(self.window, self.flush, args=(webhook_url,))
+            timer.daemon = True
+            timer.start()
+    
+    def flush(self, webhook_url):
+        with self._lock:
+            items = self._pending.pop(webhook_url, None)
+        if not items:
+            return
+        body = items[0] if len(items) == 1 else {"batch": items}
+        self._dispatch(webhook_url, body)
+    
+    def flush_all(self):
+        with self._lock:
+            urls = list(self._pending)
+        for webhook_url in urls:
+            self.flush(webhook_url)
@@ -6,7 +6,7 @@ Handles model preloading and health check readiness.
 import os
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +16,25 @@ _initialization_status = {
     'model_load_time': None,
     'model_error': None,
     'initialized_at': None,
+    'ready': False,  # Latched once startup completes; readiness cannot regress until restart
 }
 
 
+def _warm_up_flags() -> Tuple[bool, bool, bool]:
+    """
+    Read the warm-up flags from the environment in one pass.
+    
+    Returns:
+        tuple: (enable_warm_up, skip_warm_up, enable_openai_whisper)
+    """
+    env = os.environ
+    return (
+        env.get('ENABLE_MODEL_WARM_UP', 'true').lower() == 'true',
+        env.get('SKIP_MODEL_WARMUP', 'false').lower() == 'true',
+        env.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true',
+    )
+
+
 def warm_up_asr_model() -> Dict[str, Any]:
     """
     Warm up the ASR model if enabled.
@@ -29,13 +45,12 @@ def warm_up_asr_model() -> Dict[str, Any]:
     global _initialization_status
     
     # Check if ASR warm-up is enabled (enabled by default for better UX)
-    enable_warm_up = os.environ.get('ENABLE_MODEL_WARM_UP', 'true').lower() == 'true'
-    skip_warm_up = os.environ.get('SKIP_MODEL_WARMUP', 'false').lower() == 'true'
-    enable_openai_whisper = os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true'
+    enable_warm_up, skip_warm_up, enable_openai_whisper = _warm_up_flags()
     
     # Skip warmup if explicitly requested (useful for CI/CD)
     if skip_warm_up:
         logger.info("Model warm-up is skipped (SKIP_MODEL_WARMUP=true)")
+        _initialization_status['ready'] = True
         return {
             'status': 'skipped',
             'reason': 'warmup_skipped',
@@ -44,6 +59,7 @@ def warm_up_asr_model() -> Dict[str, Any]:
     
     if not enable_warm_up:
         logger.info("Model warm-up is disabled (ENABLE_MODEL_WARM_UP=false)")
+        _initialization_status['ready'] = True
         return {
             'status': 'skipped',
             'reason': 'warm_up_disabled',
@@ -53,6 +69,7 @@ def warm_up_asr_model() -> Dict[str, Any]:
     # For faster-whisper, it's enabled by default unless explicitly using OpenAI Whisper
     if enable_openai_whisper:
         logger.info("Using OpenAI Whisper backend, skipping faster-whisper warm-up")
+        _initialization_status['ready'] = True
         return {
             'status': 'skipped',
             'reason': 'openai_whisper_enabled',
@@ -80,6 +97,7 @@ def warm_up_asr_model() -> Dict[str, Any]:
             _initialization_status['model_loaded'] = True
             _initialization_status['model_load_time'] = load_time
             _initialization_status['initialized_at'] = time.time()
+            _initialization_status['ready'] = True
             
             logger.info(f"✓ ASR model loaded successfully in {load_time:.2f} seconds")
             logger.info("=" * 60)
@@ -149,10 +167,12 @@ def is_ready() -> bool:
     Returns:
         bool: True if ready, False otherwise
     """
+    # Fast path: once startup has completed the answer never changes
+    if _initialization_status.get('ready'):
+        return True
+    
     # Check if warm-up is enabled (enabled by default for better UX)
-    enable_warm_up = os.environ.get('ENABLE_MODEL_WARM_UP', 'true').lower() == 'true'
-    skip_warm_up = os.environ.get('SKIP_MODEL_WARMUP', 'false').lower() == 'true'
-    enable_openai_whisper = os.environ.get('ENABLE_OPENAI_WHISPER', 'false').lower() == 'true'
+    enable_warm_up, skip_warm_up, enable_openai_whisper = _warm_up_flags()
     
     # If warm-up is skipped/disabled or using OpenAI Whisper, always ready
     if not enable_warm_up or skip_warm_up or enable_openai_whisper:
@@ -0,0 +1,242 @@
+"""
+Test cases for the job status logging helpers in app_utils.
+"""
+
+import os
+import sys
+import json
+import time
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_utils
+
+
+def _read_job(tmp_path, job_id):
+    with open(tmp_path / 'jobs' / f'{job_id}.json') as f:
+        return json.load(f)
+
+
+class TestJobStatusLogging:
+    """Test cases for the batched job status writer."""
+
+    def test_batch_keeps_latest_status_per_job(self, tmp_path):
+        """Updates for the same job in one batch collapse into the last one."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)), \
+             patch('app_utils._write_job_file', wraps=app_utils._write_job_file) as write:
+            app_utils._write_job_batch([
+                ('job-1', {'job_status': 'queued'}),
+                ('job-1', {'job_status': 'running'}),
+                ('job-2', {'job_status': 'queued'}),
+                ('job-1', {'job_status': 'done'}),
+            ])
+
+        assert write.call_count == 2
+        assert _read_job(tmp_path, 'job-1')['job_status'] == 'done'
+        assert _read_job(tmp_path, 'job-2')['job_status'] == 'queued'
+
+    def test_log_job_status_is_written_in_background(self, tmp_path):
+        """log_job_status returns immediately and the writer persists the record."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)):
+            app_utils.log_job_status('job-3', {'job_status': 'running'})
+            app_utils.log_job_status('job-3', {'job_status': 'done'})
+
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline:
+                try:
+                    if _read_job(tmp_path, 'job-3')['job_status'] == 'done':
+                        break
+                except (OSError, ValueError):
+                    pass
+                time.sleep(0.01)
+
+        assert _read_job(tmp_path, 'job-3')['job_status'] == 'done'
+
+    def test_write_job_status_is_synchronous(self, tmp_path):
+        """write_job_status has the file on disk by the time it returns."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)):
+            app_utils.write_job_status('job-5', {'job_status': 'queued'})
+
+        assert _read_job(tmp_path, 'job-5')['job_status'] == 'queued'
+
+    def test_non_string_keys_are_written(self, tmp_path):
+        """Job responses with non-string dict keys are written like API responses."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)):
+            app_utils.write_job_status('job-8', {'response': {'segments': {1: 'a'}}})
+
+        assert _read_job(tmp_path, 'job-8')['response'] == {'segments': {'1': 'a'}}
+
+    def test_job_file_is_replaced_atomically(self, tmp_path):
+        """Rewrites swap in a complete file and leave no temporary files behind."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)), \
+             patch('app_utils.os.replace', wraps=os.replace) as replace:
+            app_utils.write_job_status('job-6', {'job_status': 'queued'})
+            app_utils.write_job_status('job-6', {'job_status': 'running'})
+
+        assert replace.call_count == 2
+        assert _read_job(tmp_path, 'job-6')['job_status'] == 'running'
+        assert os.listdir(tmp_path / 'jobs') == ['job-6.json']
+
+    def test_flush_stops_writer_before_draining(self, tmp_path):
+        """flush_job_logs joins the writer thread and leaves nothing queued."""
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)):
+            app_utils.log_job_status('job-7', {'job_status': 'done'})
+            writer = app_utils._log_writer_thread
+            app_utils.flush_job_logs()
+
+        assert not writer.is_alive()
+        assert app_utils.pending_job_logs() == 0
+        assert _read_job(tmp_path, 'job-7')['job_status'] == 'done'
+
+
+class TestRequestBody:
+    """Test cases for the per-request JSON body cache."""
+
+    def test_body_is_parsed_once_per_request(self):
+        """Repeated lookups reuse the body stored on flask.g."""
+        from flask import Flask, request
+
+        app = Flask(__name__)
+        with app.test_request_context(json={'id': 'abc'}):
+            with patch.object(request, 'get_json', wraps=request.get_json) as get_json:
+                assert app_utils.get_request_body() == {'id': 'abc'}
+                assert app_utils.get_request_body() == {'id': 'abc'}
+            assert get_json.call_count == 1
+
+    def test_non_json_body_returns_empty_dict(self):
+        """A missing or non-JSON body yields an empty dict instead of raising."""
+        from flask import Flask
+
+        app = Flask(__name__)
+        with app.test_request_context(data='plain text', content_type='text/plain'):
+            assert app_utils.get_request_body() == {}
+
+
+class TestORJSONProvider:
+    """Test cases for the orjson-backed Flask JSON provider."""
+
+    def test_round_trip_matches_stdlib(self):
+        """Encoded output decodes to the same data with keys sorted like jsonify."""
+        from flask import Flask
+
+        app = Flask(__name__)
+        app.json = app_utils.ORJSONProvider(app)
+        payload = {'b': 1.25, 'a': [1, 2, {'c': None}], 'unicode': 'café'}
+
+        encoded = app.json.dumps(payload)
+
+        assert json.loads(encoded) == payload
+        assert encoded.index('"a"') < encoded.index('"b"')
+        assert app.json.loads(encoded) == payload
+
+    def test_falls_back_to_flask_default_for_dates(self):
+        """Types orjson does not know natively go through Flask's default handler."""
+        from datetime import date
+        from decimal import Decimal
+        from flask import Flask
+
+        app = Flask(__name__)
+        app.json = app_utils.ORJSONProvider(app)
+
+        assert json.loads(app.json.dumps({'price': Decimal('1.50')})) == {'price': '1.50'}
+        assert json.loads(app.json.dumps({'day': date(2025, 1, 2)}))['day']
+
+
+class TestValidatePayload:
+    """Test cases for the precompiled payload validator."""
+
+    SCHEMA = {
+        'type': 'object',
+        'properties': {'media_url': {'type': 'string', 'format': 'uri'}},
+        'required': ['media_url'],
+    }
+
+    def _call(self, body):
+        from flask import Flask
+
+        app = Flask(__name__)
+        handler = app_utils.validate_payload(self.SCHEMA)(lambda: ('ok', 200))
+        with app.test_request_context(json=body):
+            return handler()
+
+    def test_valid_payload_reaches_handler(self):
+        """A payload matching the schema is passed through."""
+        assert self._call({'media_url': 'https://example.com/a.mp3'}) == ('ok', 200)
+
+    def test_invalid_payload_is_rejected(self):
+        """Schema violations produce a 400 with the jsonschema message."""
+        response, status = self._call({'other': 1})
+
+        assert status == 400
+        assert "'media_url' is a required property" in response.get_json()['message']
+
+    def test_invalid_schema_fails_at_decoration(self):
+        """A broken schema is reported when the route is defined, not per request."""
+        import jsonschema
+
+        with pytest.raises(jsonschema.exceptions.SchemaError):
+            app_utils.validate_payload({'type': 'not-a-type'})
+
+    def test_accepts_precompiled_validator(self):
+        """A validator from compile_schema is used directly instead of rebuilt."""
+        from flask import Flask
+
+        validator = app_utils.compile_schema(self.SCHEMA)
+        handler = app_utils.validate_payload(validator)(lambda: ('ok', 200))
+        app = Flask(__name__)
+
+        with app.test_request_context(json={'media_url': 'https://example.com/a.mp3'}):
+            assert handler() == ('ok', 200)
+        with app.test_request_context(json={'other': 1}):
+            assert handler()[1] == 400
+
+
+class TestJobStatusRecord:
+    """Test cases for the slotted job status record."""
+
+    def test_record_is_written_as_plain_json(self, tmp_path):
+        """A JobStatus is materialized into the usual job file layout."""
+        record = app_utils.JobStatus('job-4', 'done', 42, 7, {'code': 200})
+
+        with patch('app_utils.LOCAL_STORAGE_PATH', str(tmp_path)):
+            app_utils._write_job_batch([('job-4', record)])
+
+        assert _read_job(tmp_path, 'job-4') == {
+            'job_status': 'done',
+            'job_id': 'job-4',
+            'queue_id': 42,
+            'process_id': 7,
+            'response': {'code': 200},
+        }
+        assert not hasattr(record, '__dict__')
+
+
+class TestQueuedLogging:
+    """Test cases for moving log handlers behind a queue."""
+
+    def test_records_reach_original_handler_via_listener(self):
+        """Root handlers are swapped for a QueueHandler and still receive records."""
+        import logging
+        import logging.handlers
+
+        logger = logging.getLogger('test-queued-logging')
+        logger.propagate = False
+        received = []
+        target = logging.Handler()
+        target.emit = received.append
+        logger.addHandler(target)
+
+        exit_hooks = []
+        with patch('app_utils.logging.getLogger', return_value=logger), \
+             patch('app_utils.atexit.register', side_effect=exit_hooks.append):
+            app_utils.install_queued_logging()
+
+        assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+        logger.warning('queued %s', 'record')
+        exit_hooks[0]()  # stops the listener after it drains the queue
+
+        assert [r.getMessage() for r in received] == ['queued record']
+        assert logger.handlers == [target]
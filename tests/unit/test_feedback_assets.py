@@ -0,0 +1,55 @@
+"""
+Test cases for the feedback page asset rewriting in routes.v1.media.feedback.
+"""
+
+import os
+import sys
+import pytest
+from flask import Flask
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes.v1.media import feedback
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(feedback.v1_media_feedback_bp)
+    return app.test_client()
+
+
+class TestRewrittenAssets:
+    """Test cases for the cached, pre-encoded rewritten assets."""
+
+    def test_rewritten_asset_is_cached_bytes(self, tmp_path):
+        """The rewritten asset is encoded once and reused until the file changes."""
+        page = tmp_path / 'index.html'
+        page.write_text('<script src="/_next/app.js"></script>', encoding='utf-8')
+
+        first = feedback._cached_rewrite(str(page), 'html')
+
+        assert first[0] == b'<script src="/v1/media/feedback/_next/app.js"></script>'
+        assert feedback._cached_rewrite(str(page), 'html') is first
+
+        os.utime(page, ns=(0, 0))
+        assert feedback._cached_rewrite(str(page), 'html') is not first
+
+    def test_feedback_page_serves_rewritten_html(self, client):
+        """The page is served with its asset paths rebased under the blueprint."""
+        response = client.get('/v1/media/feedback')
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'text/html'
+        assert b'"/v1/media/feedback/_next/' in response.data
+
+    def test_feedback_page_revalidates_with_etag(self, client):
+        """A matching If-None-Match gets a bodiless 304."""
+        first = client.get('/v1/media/feedback')
+        etag = first.headers['ETag']
+
+        assert first.headers['Cache-Control'] == 'no-cache'
+        second = client.get('/v1/media/feedback', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.data == b''
@@ -0,0 +1,105 @@
+"""
+Test cases for the media download helpers in services.file_management.
+"""
+
+import io
+import os
+import sys
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import file_management
+
+
+class TestExtensionFromUrl:
+    """Test cases for picking a download's file extension."""
+
+    def test_url_extension_wins_over_content_type(self):
+        """A known extension in the URL path is used as-is."""
+        assert file_management.get_extension_from_url('https://example.com/a.mp4', 'audio/mpeg') == '.mp4'
+
+    def test_url_hints_are_last_resort(self):
+        """Without an extension or known content type the URL wording picks the type."""
+        assert file_management.get_extension_from_url('https://example.com/video?id=3') == '.mp4'
+        assert file_management.get_extension_from_url('https://example.com/music?id=4', '') == '.mp3'
+        assert file_management.get_extension_from_url('https://example.com/blob?id=5') == '.bin'
+
+    def test_url_hints_ignore_case(self):
+        """Keyword and placeholder matches are case-insensitive."""
+        assert file_management.get_extension_from_url('https://example.com/Get?type=PHOTO') == '.jpg'
+        assert file_management.get_extension_from_url('https://Placeholder.example/300') == '.png'
+
+
+class TestDownloadBulkhead:
+    """Test cases for the concurrent download cap."""
+
+    def test_download_fails_when_no_slot_frees_up(self, tmp_path):
+        """A download that cannot get a slot in time fails without a request."""
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with patch('services.file_management._DOWNLOAD_SLOTS', slots), \
+             patch('services.file_management.DOWNLOAD_SLOT_TIMEOUT', 0.01), \
+             patch.object(file_management._SESSION, 'get') as get:
+            with pytest.raises(RuntimeError, match='download slots'):
+                file_management.download_file('https://example.com/a.mp3', str(tmp_path))
+
+        get.assert_not_called()
+
+    def test_extension_comes_from_download_response(self, tmp_path):
+        """download_file names the file from the GET's Content-Type without a HEAD probe."""
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.headers = {'content-type': 'audio/mpeg; charset=binary'}
+        response.raw = io.BytesIO(b'data')
+
+        with patch.object(file_management._SESSION, 'get', return_value=response) as get:
+            path = file_management.download_file('https://example.com/media?id=6', str(tmp_path))
+
+        assert get.call_args.kwargs['timeout'] == (
+            file_management.DOWNLOAD_CONNECT_TIMEOUT, file_management.DOWNLOAD_READ_TIMEOUT
+        )
+        assert path.endswith('.mp3')
+        with open(path, 'rb') as f:
+            assert f.read() == b'data'
+
+
+class TestSharedSession:
+    """Test cases for the shared download session."""
+
+    def test_session_never_stores_cookies(self):
+        """Cookies set by one origin are not replayed on later downloads."""
+        from urllib.request import Request
+        from requests.cookies import create_cookie
+
+        cookie = create_cookie('session', 'abc', domain='example.com')
+        file_management._SESSION.cookies.set_cookie_if_ok(cookie, Request('https://example.com/a.mp3'))
+
+        assert len(file_management._SESSION.cookies) == 0
+
+class TestResponseText:
+    """Test cases for decoding downloaded caption text."""
+
+    def _response(self, body, content_type):
+        import requests
+
+        response = requests.Response()
+        response._content = body
+        response.headers['content-type'] = content_type
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def test_missing_charset_decodes_as_utf8(self):
+        """Without a charset the body is read as UTF-8 and a BOM is dropped."""
+        response = self._response('﻿1\nCafé\n'.encode('utf-8'), 'text/plain')
+
+        assert file_management.response_text(response) == '1\nCafé\n'
+
+    def test_declared_charset_is_respected(self):
+        """A charset named by the server is used as given."""
+        response = self._response('Café'.encode('latin-1'), 'text/plain; charset=ISO-8859-1')
+
+        assert file_management.response_text(response) == 'Café'
@@ -0,0 +1,58 @@
+"""
+Test cases for the queue_task decorator built in create_app.
+"""
+
+import os
+import sys
+import threading
+import pytest
+from unittest.mock import patch
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('API_KEY', 'test-api-key-12345')
+
+from app import app
+from app_utils import get_request_body
+
+
+class TestQueueTask:
+    """Test cases for choosing between inline and queued execution."""
+
+    def _run(self, body, **queue_options):
+        done = threading.Event()
+
+        def task(job_id, data):
+            done.set()
+            return {"ok": True}, "/test", 200
+
+        with app.test_request_context(json=body):
+            response, code = app.queue_task(**queue_options)(task)()
+        return response, code, done
+
+    def test_request_without_webhook_runs_inline(self):
+        """Without webhook_url the task runs before the response is returned."""
+        response, code, done = self._run({"id": "inline"})
+
+        assert code == 200
+        assert done.is_set()
+        assert response["response"] == {"ok": True}
+
+    def test_always_queue_returns_202_without_webhook(self):
+        """always_queue hands the task to the workers and answers with a job_id."""
+        response, code, done = self._run({"id": "queued"}, always_queue=True)
+
+        assert code == 202
+        assert response["message"] == "processing"
+        assert response["job_id"]
+        assert done.wait(timeout=5)
+
+    def test_oversized_body_is_rejected_before_parsing(self):
+        """A body over MAX_CONTENT_LENGTH raises 413 instead of being read and parsed."""
+        assert app.config['MAX_CONTENT_LENGTH'] == 16 * 1024 * 1024
+        with patch.dict(app.config, MAX_CONTENT_LENGTH=16):
+            with app.test_request_context(json={"padding": "x" * 64}):
+                with pytest.raises(RequestEntityTooLarge):
+                    get_request_body()
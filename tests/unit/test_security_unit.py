@@ -82,6 +82,21 @@ class TestAPIKeyAuthentication(unittest.TestCase):
         result = test_func()
         self.assertEqual(result[1], 401)
 
+    def test_require_api_key_non_ascii_header(self):
+        """A non-matching key of a different length is rejected, not an error."""
+        from flask import Flask
+
+        os.environ['API_KEY'] = 'correct-key'
+
+        @require_api_key
+        def test_func():
+            return "success", 200
+
+        app = Flask(__name__)
+        with app.test_request_context(headers={'X-API-Key': 'k\u00e9y'}):
+            result = test_func()
+        self.assertEqual(result[1], 401)
+
 
 class TestRateLimiting(unittest.TestCase):
     """Test rate limiting functionality."""
@@ -92,7 +107,7 @@ class TestRateLimiting(unittest.TestCase):
         security._rate_buckets.clear()
 
     @patch('security.request')
-    @patch('security.time.time')
+    @patch('security.time.monotonic')
     def test_rate_limit_allows_requests_under_limit(self, mock_time, mock_request):
         """Test that requests under the limit are allowed."""
         mock_request.remote_addr = '127.0.0.1'
@@ -109,7 +124,7 @@ class TestRateLimiting(unittest.TestCase):
             self.assertEqual(result, ("success", 200))
 
     @patch('security.request')
-    @patch('security.time.time')
+    @patch('security.time.monotonic')
     def test_rate_limit_blocks_excess_requests(self, mock_time, mock_request):
         """Test that requests over the limit are blocked."""
         mock_request.remote_addr = '127.0.0.1'
@@ -131,7 +146,7 @@ class TestRateLimiting(unittest.TestCase):
         self.assertIn("Too Many Requests", str(result[0]))
 
     @patch('security.request')
-    @patch('security.time.time')
+    @patch('security.time.monotonic')
     def test_rate_limit_window_sliding(self, mock_time, mock_request):
         """Test that the rate limit window slides over time."""
         mock_request.remote_addr = '127.0.0.1'
@@ -184,6 +199,211 @@ class TestRateLimiting(unittest.TestCase):
         result = test_func()
         self.assertEqual(result, ("success", 200))
 
+    def test_disabled_rate_limit_returns_view_unwrapped(self):
+        """With ENABLE_RATE_LIMITING off the decorator is the identity."""
+        import security
+
+        def test_func():
+            return "success", 200
+
+        with patch.object(security, 'ENABLE_RATE_LIMITING', False):
+            self.assertIs(rate_limit(max_per_minute=1)(test_func), test_func)
+        self.assertIs(rate_limit(max_per_minute=-1)(test_func), test_func)
+        self.assertIs(rate_limit(max_per_minute=0)(test_func), test_func)
+
+
+class TestScopedRateLimiting(unittest.TestCase):
+    """Test per-route rate limit scopes."""
+
+    def setUp(self):
+        """Clear rate limit buckets before each test."""
+        import security
+        from flask import Flask
+        security._rate_buckets.clear()
+        self.app = Flask(__name__)
+
+    def _call(self, func, api_key):
+        with self.app.test_request_context(headers={'X-API-Key': api_key}):
+            return func()
+
+    def test_scoped_limit_is_keyed_by_api_key(self):
+        """Each API key gets its own budget on a scoped route."""
+        @rate_limit(max_per_minute=1, key_by='api_key', scope='m4a')
+        def test_func():
+            return "success", 200
+
+        self.assertEqual(self._call(test_func, 'key-a'), ("success", 200))
+        self.assertEqual(self._call(test_func, 'key-a')[1], 429)
+        self.assertEqual(self._call(test_func, 'key-b'), ("success", 200))
+
+    def test_scoped_limit_does_not_share_global_bucket(self):
+        """Requests to a scoped route do not count against unscoped routes."""
+        @rate_limit(max_per_minute=1, key_by='api_key', scope='m4a')
+        def scoped():
+            return "success", 200
+
+        @rate_limit(max_per_minute=1, key_by='api_key')
+        def unscoped():
+            return "success", 200
+
+        self.assertEqual(self._call(scoped, 'key-a'), ("success", 200))
+        self.assertEqual(self._call(unscoped, 'key-a'), ("success", 200))
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test the token-bucket refill behaviour."""
+
+    def setUp(self):
+        import security
+        from flask import Flask
+        security._rate_buckets.clear()
+        self.app = Flask(__name__)
+
+    def _call(self, func):
+        with self.app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            return func()
+
+    @patch('security.time.monotonic')
+    def test_tokens_refill_at_the_per_minute_rate(self, mock_time):
+        """An emptied bucket admits one request per refill interval, with Retry-After set."""
+        @rate_limit(max_per_minute=60, burst=2)
+        def test_func():
+            return "success", 200
+
+        mock_time.return_value = 1000.0
+        self.assertEqual(self._call(test_func), ("success", 200))
+        self.assertEqual(self._call(test_func), ("success", 200))
+        blocked = self._call(test_func)
+        self.assertEqual(blocked[1], 429)
+        self.assertEqual(blocked[2]["Retry-After"], "1")
+        self.assertEqual(blocked[0].get_json(), {"message": "Too Many Requests"})
+
+        mock_time.return_value = 1001.0
+        self.assertEqual(self._call(test_func), ("success", 200))
+        self.assertEqual(self._call(test_func)[1], 429)
+
+
+    @patch('security.time.monotonic')
+    def test_refilled_buckets_are_evicted(self, mock_time):
+        """A client whose bucket has fully refilled no longer holds an entry."""
+        import security
+
+        @rate_limit(max_per_minute=60, burst=2)
+        def test_func():
+            return "success", 200
+
+        mock_time.return_value = 1000.0
+        self._call(test_func)
+        lock, buckets = security._rate_buckets.shard('ip:10.0.0.1')
+        self.assertIn('ip:10.0.0.1', buckets)
+
+        # Two seconds later the bucket has refilled, so it is evicted
+        with lock:
+            security._evict_idle(buckets, 1002.0)
+        self.assertNotIn('ip:10.0.0.1', buckets)
+
+    def test_least_recent_buckets_dropped_beyond_cap(self):
+        """Still-refilling buckets are evicted oldest first once a shard is full."""
+        import security
+        from collections import OrderedDict
+
+        buckets = OrderedDict((f'ip:{i}', [0.0, 1000.0, 2000.0]) for i in range(5))
+        security._evict_idle(buckets, 1000.0, max_keys=3)
+        self.assertEqual(list(buckets), ['ip:2', 'ip:3', 'ip:4'])
+
+
+class TestSlidingWindowCounter(unittest.TestCase):
+    """Test the two-counter sliding window strategy."""
+
+    def setUp(self):
+        import security
+        from flask import Flask
+        security._rate_buckets.clear()
+        self.app = Flask(__name__)
+
+    def _call(self, func):
+        with self.app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.2'}):
+            return func()
+
+    @patch('security.time.monotonic')
+    def test_previous_window_is_weighted_by_overlap(self, mock_time):
+        """Last window's requests count in proportion to how much of it is still in range."""
+        @rate_limit(max_per_minute=4, strategy='sliding_window')
+        def test_func():
+            return "success", 200
+
+        mock_time.return_value = 1230.0  # halfway through a window
+        for _ in range(4):
+            self.assertEqual(self._call(test_func), ("success", 200))
+        self.assertEqual(self._call(test_func)[1], 429)
+
+        # A quarter into the next window, 3/4 of the previous 4 requests still count
+        mock_time.return_value = 1275.0
+        self.assertEqual(self._call(test_func), ("success", 200))
+        self.assertEqual(self._call(test_func)[1], 429)
+
+    def test_strategies_do_not_share_unscoped_buckets(self):
+        """One client can call token-bucket and sliding-window routes without clashing."""
+        @rate_limit(max_per_minute=4, strategy='sliding_window')
+        def windowed():
+            return "success", 200
+
+        @rate_limit(max_per_minute=4, strategy='token_bucket')
+        def bucketed():
+            return "success", 200
+
+        self.assertEqual(self._call(bucketed), ("success", 200))
+        self.assertEqual(self._call(windowed), ("success", 200))
+        self.assertEqual(self._call(bucketed), ("success", 200))
+
+
+class TestConcurrencyLimiting(unittest.TestCase):
+    """Test the per-key in-flight request cap."""
+
+    def setUp(self):
+        from flask import Flask
+        self.app = Flask(__name__)
+
+    def _call(self, func, api_key):
+        with self.app.test_request_context(headers={'X-API-Key': api_key}):
+            return func()
+
+    def test_rejects_while_key_has_request_in_flight(self):
+        """A second concurrent call from the same key is rejected until the first finishes."""
+        import security
+        from security import concurrency_limit
+
+        @concurrency_limit(1, key_by='api_key', scope='test')
+        def outer():
+            inner_result = self._call(inner, 'key-a')
+            other_key = self._call(inner, 'key-b')
+            return inner_result, other_key
+
+        @concurrency_limit(1, key_by='api_key', scope='test')
+        def inner():
+            return "success", 200
+
+        inner_result, other_key = self._call(outer, 'key-a')
+
+        self.assertEqual(inner_result[1], 429)
+        self.assertEqual(inner_result[2], {"X-Concurrency-Remaining": "0"})
+        self.assertEqual(other_key, ("success", 200))
+        self.assertEqual(self._call(inner, 'key-a'), ("success", 200))
+        self.assertEqual(security._inflight, {})
+
+    def test_slot_is_released_on_error(self):
+        """An exception in the view still frees the slot."""
+        import security
+        from security import concurrency_limit
+
+        @concurrency_limit(1, key_by='api_key', scope='test')
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self._call(failing, 'key-a')
+        self.assertEqual(security._inflight, {})
+
 
 class TestHelperFunctions(unittest.TestCase):
     """Test helper functions."""
@@ -210,6 +430,29 @@ class TestHelperFunctions(unittest.TestCase):
         ip = _get_client_ip(mock_request)
         self.assertEqual(ip, '192.168.1.100')
 
+    def test_get_client_ip_empty_forwarded_entry(self):
+        """An empty first X-Forwarded-For entry falls back to remote_addr."""
+        from flask import Flask
+        from security import _get_client_ip
+
+        app = Flask(__name__)
+        with app.test_request_context(headers={'X-Forwarded-For': ' , 198.51.100.1'},
+                                      environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            from flask import request
+            self.assertEqual(_get_client_ip(request), '10.0.0.1')
+
+    def test_client_key_computed_once_per_request(self):
+        """Stacked limiters reuse the key stored in the request environ."""
+        from flask import Flask, request
+        from security import _rate_limit_key_fn
+
+        app = Flask(__name__)
+        key_fn = _rate_limit_key_fn('api_key')
+        with app.test_request_context(headers={'X-API-Key': 'test-api-123'}):
+            self.assertEqual(key_fn(request), 'api_key:test-api-123')
+            request.environ['security.client_key.api_key'] = 'api_key:cached'
+            self.assertEqual(key_fn(request), 'api_key:cached')
+
     @patch('security.request')
     def test_get_rate_limit_key_by_ip(self, mock_request):
         """Test getting rate limit key by IP."""
@@ -235,6 +478,50 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertEqual(key, 'api_key:test-api-123')
 
 
+
+class TestSecurityHeaders(unittest.TestCase):
+    """Test the after_request security headers."""
+
+    def test_headers_are_added_without_overriding(self):
+        """Default headers fill in what the view did not set itself."""
+        import security
+        from flask import Flask, Response
+
+        app = Flask(__name__)
+        response = Response('ok')
+        response.headers['x-frame-options'] = 'SAMEORIGIN'
+        with app.test_request_context():
+            security.add_security_headers(response)
+
+        self.assertEqual(response.headers['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response.headers.getlist('X-Frame-Options'), ['SAMEORIGIN'])
+
+    def test_cors_headers_only_for_allowed_origins(self):
+        """Allowed origins are echoed back; others get no CORS headers."""
+        import security
+        from flask import Flask, Response
+
+        app = Flask(__name__)
+        allowed = frozenset({'https://app.example.com'})
+        with patch.object(security, '_ALLOWED_ORIGIN_SET', allowed):
+            for origin, expected in (('https://app.example.com', 'https://app.example.com'),
+                                     ('https://evil.example.com', None)):
+                response = Response('ok')
+                with app.test_request_context(headers={'Origin': origin}):
+                    security.add_security_headers(response)
+                self.assertEqual(response.headers.get('Access-Control-Allow-Origin'), expected)
+
+    def test_no_hook_when_nothing_to_add(self):
+        """register_security leaves the app alone when headers and CORS are off."""
+        import security
+        from flask import Flask
+
+        app = Flask(__name__)
+        with patch.object(security, '_SECURITY_HEADER_ITEMS', ()), \
+                patch.object(security, '_ALLOWED_ORIGIN_SET', frozenset()):
+            security.register_security(app)
+        self.assertFalse(app.after_request_funcs.get(None))
+
 if __name__ == '__main__':
     # Set up test environment
     os.environ['API_KEY'] = 'test-api-key'
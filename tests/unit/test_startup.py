@@ -107,6 +107,19 @@ class TestStartup:
             assert result['model_loaded'] is False
             assert 'asr' in result['message'].lower()
     
+    def test_is_ready_latched_after_warm_up(self):
+        """Test that readiness is latched once warm-up succeeds."""
+        os.environ['ENABLE_MODEL_WARM_UP'] = 'true'
+        fake_asr = Mock(get_model=Mock(return_value=Mock()))
+        
+        with patch.dict('sys.modules', {'services.asr': fake_asr}):
+            startup.warm_up_asr_model()
+        assert startup.get_initialization_status()['ready'] is True
+        
+        # The fast path no longer consults the per-field status
+        startup._initialization_status['model_loaded'] = False
+        assert startup.is_ready() is True
+    
     def test_is_ready_warm_up_disabled(self):
         """Test readiness check when warm-up is disabled."""
         os.environ['ENABLE_MODEL_WARM_UP'] = 'false'
@@ -205,7 +218,9 @@ class TestHealthCheck:
         """Test health check when warm-up is disabled."""
         os.environ['ENABLE_MODEL_WARM_UP'] = 'false'
         
-        response = client.get('/health')
+        # The reported configuration is read once at import time
+        with patch('app.WARM_UP_ENABLED', False):
+            response = client.get('/health')
         data = response.get_json()
         
         assert response.status_code == 200
@@ -247,6 +262,7 @@ class TestHealthCheck:
         assert data['ready'] is True
         assert data['initialization']['model_loaded'] is True
         assert data['initialization']['model_load_time'] == 2.5
+        assert data['job_log_backlog'] >= 0
     
     def test_health_check_with_error(self, client):
         """Test health check when there was an error during warm-up."""
@@ -266,6 +282,32 @@ class TestHealthCheck:
         assert 'error' in data['initialization']
         assert data['initialization']['error'] == 'Failed to load model'
 
+    
+    def test_health_check_reuses_cached_body(self, client):
+        """Test that repeated probes reuse the body until readiness changes."""
+        os.environ['ENABLE_MODEL_WARM_UP'] = 'true'
+        startup._initialization_status['model_loaded'] = True
+        startup._initialization_status['model_load_time'] = 1.5
+        
+        first = client.get('/health').get_json()
+        second = client.get('/health').get_json()
+        assert second['timestamp'] == first['timestamp']
+        
+        # A state change must not be masked by the cache
+        startup._initialization_status['model_loaded'] = False
+        response = client.get('/health')
+        assert response.status_code == 503
+        assert response.get_json()['ready'] is False
+    
+    def test_liveness_is_answered_before_flask(self, client):
+        """Test that the liveness probe returns a static body without readiness checks."""
+        with patch('app.is_ready') as mock_is_ready:
+            response = client.get('/health/live')
+        
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'alive'
+        mock_is_ready.assert_not_called()
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
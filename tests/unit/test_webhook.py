@@ -0,0 +1,157 @@
+"""
+Test cases for webhook delivery helpers.
+"""
+
+import os
+import sys
+import json
+import threading
+import requests
+from unittest.mock import Mock, patch
+from urllib.request import Request
+from requests.cookies import create_cookie
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('API_KEY', 'test-api-key-12345')
+
+from services import webhook
+from services.webhook import CircuitBreaker, WebhookBatcher
+
+
+class TestWebhookBatcher:
+    """Test cases for per-URL webhook batching."""
+    
+    def test_single_payload_is_sent_unwrapped(self):
+        """A window with one payload keeps the original single-object body."""
+        dispatch = Mock()
+        batcher = WebhookBatcher(60, dispatch)
+        
+        batcher.enqueue('https://example.com/hook', {'job_id': 'a'})
+        batcher.flush_all()
+        
+        dispatch.assert_called_once_with('https://example.com/hook', {'job_id': 'a'})
+    
+    def test_payloads_are_grouped_per_url(self):
+        """Payloads for the same URL are combined; other URLs stay separate."""
+        dispatch = Mock()
+        batcher = WebhookBatcher(60, dispatch)
+        
+        batcher.enqueue('https://a.example.com', {'job_id': '1'})
+        batcher.enqueue('https://a.example.com', {'job_id': '2'})
+        batcher.enqueue('https://b.example.com', {'job_id': '3'})
+        batcher.flush_all()
+        
+        calls = {call.args[0]: call.args[1] for call in dispatch.call_args_list}
+        assert calls['https://a.example.com'] == {'batch': [{'job_id': '1'}, {'job_id': '2'}]}
+        assert calls['https://b.example.com'] == {'job_id': '3'}
+    
+    def test_timer_flushes_after_window(self):
+        """Pending payloads are delivered once the window elapses."""
+        delivered = threading.Event()
+        batcher = WebhookBatcher(0.01, lambda url, body: delivered.set())
+        
+        batcher.enqueue('https://example.com/hook', {'job_id': 'a'})
+        
+        assert delivered.wait(2)
+
+
+class TestSendWebhook:
+    """Test cases for webhook delivery."""
+    
+    def test_payload_is_posted_as_json(self):
+        """The payload is encoded once with orjson and sent as application/json."""
+        with patch.object(webhook._SESSION, 'post') as post:
+            post.return_value.status_code = 200
+            webhook.send_webhook('https://example.com/hook', {'job_id': 'a', 'run_time': 1.5})
+        
+        kwargs = post.call_args.kwargs
+        assert kwargs['headers']['Content-Type'] == 'application/json'
+        assert json.loads(kwargs['data']) == {'job_id': 'a', 'run_time': 1.5}
+        assert kwargs['timeout'] == webhook.WEBHOOK_TIMEOUT
+    
+    def test_non_string_keys_are_encoded(self):
+        """Webhook bodies accept the same payloads as API responses, e.g. integer keys."""
+        with patch.object(webhook._SESSION, 'post') as post:
+            post.return_value.status_code = 200
+            webhook.send_webhook('https://example.com/hook', {'segments': {1: 'a'}})
+        
+        assert json.loads(post.call_args.kwargs['data']) == {'segments': {'1': 'a'}}
+    
+    def test_open_circuit_skips_delivery(self):
+        """After repeated connection failures a URL is skipped until the cooldown."""
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        with patch.object(webhook, '_BREAKER', breaker), \
+             patch.object(webhook._SESSION, 'post', side_effect=requests.ConnectionError('down')) as post:
+            for _ in range(3):
+                webhook.send_webhook('https://down.example.com/hook', {'job_id': 'a'})
+        
+        assert post.call_count == 2
+        assert breaker.state('https://down.example.com/hook') == 'open'
+    
+    def test_open_circuit_is_per_url(self):
+        """A failing endpoint does not block other endpoints on the same host."""
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        with patch.object(webhook, '_BREAKER', breaker), \
+             patch.object(webhook._SESSION, 'post', side_effect=requests.ConnectionError('down')):
+            webhook.send_webhook('https://hooks.example.com/tenant-a', {'job_id': 'a'})
+        with patch.object(webhook, '_BREAKER', breaker), \
+             patch.object(webhook._SESSION, 'post') as post:
+            post.return_value.status_code = 200
+            webhook.send_webhook('https://hooks.example.com/tenant-b', {'job_id': 'b'})
+        
+        post.assert_called_once()
+        assert breaker.state('https://hooks.example.com/tenant-a') == 'open'
+    
+    def test_encode_error_releases_probe(self):
+        """A payload we cannot encode frees the half-open probe without counting against the URL."""
+        url = 'https://example.com/hook'
+        breaker = CircuitBreaker(threshold=1, cooldown=10)
+        with patch('services.webhook.time.monotonic', return_value=100.0):
+            breaker.record_failure(url)
+        
+        with patch.object(webhook, '_BREAKER', breaker), \
+             patch.object(webhook._SESSION, 'post') as post, \
+             patch('services.webhook.time.monotonic', return_value=111.0):
+            webhook.send_webhook(url, {'payload': object()})
+            post.assert_not_called()
+            assert breaker.state(url) == 'open'
+            # Still past the cooldown, so the next delivery may probe straight away
+            assert breaker.allow(url)
+    
+    def test_session_never_stores_cookies(self):
+        """Cookies set by one receiver are not sent with other tenants' webhooks."""
+        cookie = create_cookie('session', 'abc', domain='example.com')
+        webhook._SESSION.cookies.set_cookie_if_ok(cookie, Request('https://example.com/hook'))
+        
+        assert len(webhook._SESSION.cookies) == 0
+
+
+class TestCircuitBreaker:
+    """Test cases for the per-URL circuit breaker."""
+    
+    def test_zero_threshold_disables_breaker(self):
+        """With threshold 0 failures are never tracked and every call is allowed."""
+        breaker = CircuitBreaker(threshold=0, cooldown=10)
+        for _ in range(3):
+            breaker.record_failure('https://example.com/hook')
+        
+        assert breaker.allow('https://example.com/hook')
+        assert breaker.state('https://example.com/hook') == 'closed'
+    
+    def test_half_open_allows_single_probe(self):
+        """After the cooldown one call is let through; success closes the circuit."""
+        breaker = CircuitBreaker(threshold=1, cooldown=10)
+        with patch('services.webhook.time.monotonic', return_value=100.0):
+            breaker.record_failure('host')
+            assert not breaker.allow('host')
+        
+        with patch('services.webhook.time.monotonic', return_value=111.0):
+            assert breaker.allow('host')
+            assert not breaker.allow('host')
+            assert breaker.state('host') == 'half_open'
+        
+        breaker.record_success('host')
+        assert breaker.state('host') == 'closed'
+        assert breaker.allow('host')